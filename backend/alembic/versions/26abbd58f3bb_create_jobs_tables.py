@@ -0,0 +1,62 @@
+"""Create jobs and job_items tables
+
+Revision ID: 26abbd58f3bb
+Revises: d22ebfcbd631
+Create Date: 2026-10-18 11:27:05.884310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '26abbd58f3bb'
+down_revision: Union[str, None] = 'd22ebfcbd631'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_items', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_jobs_id'), 'jobs', ['id'], unique=False)
+    op.create_table('job_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.String(), nullable=False),
+    sa.Column('prompt_id', sa.String(), nullable=False),
+    sa.Column('video_url', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(), nullable=True),
+    sa.Column('claimed_at', sa.DateTime(), nullable=True),
+    sa.Column('output_id', sa.String(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.ForeignKeyConstraint(['output_id'], ['outputs.id'], ),
+    sa.ForeignKeyConstraint(['prompt_id'], ['prompts.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_job_items_id'), 'job_items', ['id'], unique=False)
+    op.create_index('ix_job_items_job_id_status', 'job_items', ['job_id', 'status'], unique=False)
+    op.create_index('ix_job_items_status_run_after', 'job_items', ['status', 'run_after'], unique=False)
+    op.create_index('ix_job_items_status_claimed_at', 'job_items', ['status', 'claimed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_items_status_claimed_at', table_name='job_items')
+    op.drop_index('ix_job_items_status_run_after', table_name='job_items')
+    op.drop_index('ix_job_items_job_id_status', table_name='job_items')
+    op.drop_index(op.f('ix_job_items_id'), table_name='job_items')
+    op.drop_table('job_items')
+    op.drop_index(op.f('ix_jobs_id'), table_name='jobs')
+    op.drop_table('jobs')
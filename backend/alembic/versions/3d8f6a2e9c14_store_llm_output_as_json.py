@@ -0,0 +1,104 @@
+"""Store outputs.llm_output as native JSON, compressing large documents
+
+Revision ID: 3d8f6a2e9c14
+Revises: 9e4b2d7c1f60
+Create Date: 2026-10-18 15:02:51.337905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import json
+import zlib
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d8f6a2e9c14'
+down_revision: Union[str, None] = '9e4b2d7c1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 500
+# Frozen copy of LLM_OUTPUT_COMPRESS_THRESHOLD at the time of this migration
+COMPRESS_THRESHOLD = 2048
+CHECK_NAME = 'ck_outputs_llm_output_one_column'
+
+# Both columns as they are while llm_output still holds JSON text
+outputs = sa.table(
+    'outputs',
+    sa.column('id', sa.String()),
+    sa.column('llm_output', sa.String()),
+    sa.column('llm_output_zlib', sa.LargeBinary()),
+)
+
+
+def _rewrite(where, transform) -> None:
+    """Set the columns `transform` returns for (llm_output, llm_output_zlib) of matching rows, in batches."""
+    bind = op.get_bind()
+    ids = bind.execute(sa.select(outputs.c.id).where(where)).scalars().all()
+    update = (
+        outputs.update()
+        .where(outputs.c.id == sa.bindparam('_id'))
+        .values(llm_output=sa.bindparam('_text'), llm_output_zlib=sa.bindparam('_zlib'))
+    )
+    for start in range(0, len(ids), BACKFILL_BATCH_SIZE):
+        rows = bind.execute(
+            sa.select(outputs.c.id, outputs.c.llm_output, outputs.c.llm_output_zlib)
+            .where(outputs.c.id.in_(ids[start:start + BACKFILL_BATCH_SIZE]))
+        ).all()
+        params = []
+        for row in rows:
+            values = transform(row.llm_output, row.llm_output_zlib)
+            if values is not None:
+                params.append({'_id': row.id, '_text': values[0], '_zlib': values[1]})
+        if params:
+            bind.execute(update, params)
+
+
+def _compress(text, compressed):
+    raw = json.dumps(json.loads(text), separators=(',', ':')).encode('utf-8')
+    if len(raw) <= COMPRESS_THRESHOLD:
+        return None
+    return None, zlib.compress(raw)
+
+
+def _decompress(text, compressed):
+    return zlib.decompress(compressed).decode('utf-8'), None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('outputs', sa.Column('llm_output_zlib', sa.LargeBinary(), nullable=True))
+    with op.batch_alter_table('outputs') as batch_op:
+        batch_op.alter_column('llm_output', existing_type=sa.String(), nullable=True)
+
+    # Compress while the column still holds text. A document is at most 4 bytes
+    # per character, so shorter texts cannot exceed the threshold
+    _rewrite(sa.func.length(outputs.c.llm_output) > COMPRESS_THRESHOLD // 4, _compress)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE outputs ALTER COLUMN llm_output TYPE JSONB USING llm_output::jsonb')
+    else:
+        # SQLite stores JSON as text, so existing rows need no conversion
+        with op.batch_alter_table('outputs') as batch_op:
+            batch_op.alter_column('llm_output', type_=sa.JSON(), existing_nullable=True)
+    with op.batch_alter_table('outputs') as batch_op:
+        batch_op.create_check_constraint(CHECK_NAME, '(llm_output IS NULL) <> (llm_output_zlib IS NULL)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('outputs') as batch_op:
+        batch_op.drop_constraint(CHECK_NAME, type_='check')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE outputs ALTER COLUMN llm_output TYPE VARCHAR USING llm_output::text')
+    else:
+        with op.batch_alter_table('outputs') as batch_op:
+            batch_op.alter_column('llm_output', type_=sa.String(), existing_nullable=True)
+
+    _rewrite(outputs.c.llm_output_zlib.isnot(None), _decompress)
+
+    with op.batch_alter_table('outputs') as batch_op:
+        batch_op.alter_column('llm_output', existing_type=sa.String(), nullable=False)
+        batch_op.drop_column('llm_output_zlib')
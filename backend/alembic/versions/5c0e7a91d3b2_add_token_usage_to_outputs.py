@@ -0,0 +1,42 @@
+"""Add token usage columns to outputs
+
+Revision ID: 5c0e7a91d3b2
+Revises: f11bad02e43e
+Create Date: 2026-10-18 13:48:12.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e7a91d3b2'
+down_revision: Union[str, None] = 'f11bad02e43e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOKEN_COLUMNS = ['prompt_tokens', 'video_tokens', 'audio_tokens', 'output_tokens', 'cached_tokens', 'total_tokens']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows only hold word-count estimates, so their token columns stay null
+    with op.batch_alter_table('outputs') as batch_op:
+        batch_op.add_column(sa.Column('model_version', sa.String(), nullable=True))
+        for name in TOKEN_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.Integer(), nullable=True))
+
+    op.create_index('ix_outputs_run_date', 'outputs', ['run_date'], unique=False)
+    op.create_index('ix_outputs_model_run_date', 'outputs', ['model', 'run_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outputs_model_run_date', table_name='outputs')
+    op.drop_index('ix_outputs_run_date', table_name='outputs')
+    with op.batch_alter_table('outputs') as batch_op:
+        for name in reversed(TOKEN_COLUMNS):
+            batch_op.drop_column(name)
+        batch_op.drop_column('model_version')
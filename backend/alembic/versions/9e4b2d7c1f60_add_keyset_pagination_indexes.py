@@ -0,0 +1,32 @@
+"""Add keyset pagination indexes to videos and prompts
+
+Revision ID: 9e4b2d7c1f60
+Revises: 5c0e7a91d3b2
+Create Date: 2026-10-18 14:20:37.918442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b2d7c1f60'
+down_revision: Union[str, None] = '5c0e7a91d3b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows from before created_at had a server default would sort unpredictably
+    op.execute("UPDATE videos SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.execute("UPDATE prompts SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.create_index('ix_videos_created_at_id', 'videos', ['created_at', 'id'], unique=False)
+    op.create_index('ix_prompts_created_at_id', 'prompts', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_prompts_created_at_id', table_name='prompts')
+    op.drop_index('ix_videos_created_at_id', table_name='videos')
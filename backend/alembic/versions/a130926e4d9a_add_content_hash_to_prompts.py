@@ -0,0 +1,78 @@
+"""Add content_hash to prompts
+
+Revision ID: a130926e4d9a
+Revises: ccc28418734a
+Create Date: 2026-10-18 10:03:21.540917
+
+"""
+from typing import Sequence, Union
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a130926e4d9a'
+down_revision: Union[str, None] = 'ccc28418734a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+prompts = sa.table(
+    'prompts',
+    sa.column('id', sa.String()),
+    sa.column('system_prompt', sa.String()),
+    sa.column('user_prompt', sa.String()),
+    sa.column('content_hash', sa.String()),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+)
+
+
+def _prompt_hash(user_prompt, system_prompt):
+    # Frozen copy of app.core.hashing.prompt_hash at the time of this migration
+    content = " ".join((user_prompt or "").split())
+    if system_prompt and system_prompt.strip():
+        content = " ".join(system_prompt.split()) + "\0" + content
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('prompts', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    # Backfill before creating the unique index. Only the oldest prompt with a
+    # given content gets the hash; later duplicates keep NULL so they stay
+    # reachable by ID without violating the index.
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(prompts.c.id, prompts.c.system_prompt, prompts.c.user_prompt)
+        .order_by(prompts.c.created_at, prompts.c.id)
+    )
+    seen = set()
+    batch = []
+    update = (
+        prompts.update()
+        .where(prompts.c.id == sa.bindparam('_id'))
+        .values(content_hash=sa.bindparam('_hash'))
+    )
+    for row in rows.fetchall():
+        content_hash = _prompt_hash(row.user_prompt, row.system_prompt)
+        if content_hash in seen:
+            continue
+        seen.add(content_hash)
+        batch.append({'_id': row.id, '_hash': content_hash})
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            bind.execute(update, batch)
+            batch = []
+    if batch:
+        bind.execute(update, batch)
+
+    op.create_index(op.f('ix_prompts_content_hash'), 'prompts', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_prompts_content_hash'), table_name='prompts')
+    op.drop_column('prompts', 'content_hash')
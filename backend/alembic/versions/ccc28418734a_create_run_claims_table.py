@@ -0,0 +1,32 @@
+"""Create run_claims table
+
+Revision ID: ccc28418734a
+Revises: 8f7d9e6c5b4a
+Create Date: 2026-10-18 09:12:40.118254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ccc28418734a'
+down_revision: Union[str, None] = '8f7d9e6c5b4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('run_claims',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('claimed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('run_claims')
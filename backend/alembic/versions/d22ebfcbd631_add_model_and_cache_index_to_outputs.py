@@ -0,0 +1,64 @@
+"""Add model and cache index to outputs
+
+Revision ID: d22ebfcbd631
+Revises: a130926e4d9a
+Create Date: 2026-10-18 10:41:57.302196
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd22ebfcbd631'
+down_revision: Union[str, None] = 'a130926e4d9a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing outputs were all generated with gemini-2.0-flash
+    with op.batch_alter_table('outputs') as batch_op:
+        batch_op.add_column(
+            sa.Column('model', sa.String(), nullable=False, server_default='gemini-2.0-flash')
+        )
+    with op.batch_alter_table('outputs') as batch_op:
+        batch_op.alter_column('model', server_default=None)
+
+    # Keep the oldest output for each (prompt, video, model) so the unique index
+    # can be built. The others are moved to outputs_duplicates, not lost;
+    # downgrade puts them back
+    op.execute(
+        """
+        CREATE TABLE outputs_duplicates AS
+        SELECT * FROM outputs WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY prompt_id, video_id, model ORDER BY run_date, id
+                ) AS rn
+                FROM outputs
+            ) ranked
+            WHERE rn > 1
+        )
+        """
+    )
+    op.execute('DELETE FROM outputs WHERE id IN (SELECT id FROM outputs_duplicates)')
+
+    op.create_index(
+        'ix_outputs_prompt_id_video_id_model', 'outputs',
+        ['prompt_id', 'video_id', 'model'], unique=True
+    )
+    op.create_index(op.f('ix_outputs_video_id'), 'outputs', ['video_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_outputs_video_id'), table_name='outputs')
+    op.drop_index('ix_outputs_prompt_id_video_id_model', table_name='outputs')
+    op.execute('INSERT INTO outputs SELECT * FROM outputs_duplicates')
+    op.drop_table('outputs_duplicates')
+    with op.batch_alter_table('outputs') as batch_op:
+        batch_op.drop_column('model')
@@ -0,0 +1,33 @@
+"""Create api_quota_usage table
+
+Revision ID: f11bad02e43e
+Revises: 26abbd58f3bb
+Create Date: 2026-10-18 13:05:44.271903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f11bad02e43e'
+down_revision: Union[str, None] = '26abbd58f3bb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('api_quota_usage',
+    sa.Column('api', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('api', 'day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('api_quota_usage')
@@ -1,4 +1,6 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.async_database import get_async_sessionmaker
 from app.db.database import SessionLocal
 
 def get_db() -> Generator:
@@ -6,4 +8,8 @@ def get_db() -> Generator:
         db = SessionLocal()
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_sessionmaker()() as db:
+        yield db
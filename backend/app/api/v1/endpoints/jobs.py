@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.core.config import settings
+from app.schemas import job as job_schema
+from app.services import prompt_runner
+from app.crud import crud_job, crud_prompt
+from app.db.models.job import JobItemStatus
+import uuid
+
+router = APIRouter()
+
+def _progress(db: Session, job) -> job_schema.JobProgress:
+    counts = crud_job.get_counts(db, job_id=job.id)
+    pending = counts.get(JobItemStatus.PENDING, 0)
+    if pending + counts.get(JobItemStatus.RUNNING, 0) == 0:
+        status = "completed"
+    elif pending == job.total_items:
+        status = "pending"
+    else:
+        status = "running"
+    return job_schema.JobProgress(
+        id=job.id,
+        status=status,
+        created_at=job.created_at,
+        total_items=job.total_items,
+        **counts
+    )
+
+@router.post("/", response_model=job_schema.JobProgress)
+def create_job(
+    *,
+    db: Session = Depends(deps.get_db),
+    job_in: job_schema.JobCreate
+) -> job_schema.JobProgress:
+    """
+    Submit a prompt x video matrix to be run by the background workers.
+    """
+    # Validate URLs up front and collapse duplicates
+    video_urls = {}
+    for video_url in job_in.videoUrls:
+        try:
+            youtube_id = prompt_runner.extract_youtube_id(video_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        video_urls.setdefault(youtube_id, video_url)
+
+    prompt_ids = []
+    for prompt_id in job_in.promptIds:
+        if not crud_prompt.get(db, id=prompt_id):
+            raise HTTPException(status_code=404, detail=f"Prompt {prompt_id} not found")
+        prompt_ids.append(prompt_id)
+    for prompt_text in job_in.prompts:
+        prompt = crud_prompt.get_or_create_by_content(
+            db,
+            id=str(uuid.uuid4()),
+            system_prompt="",
+            user_prompt=prompt_text,
+            user_id=1  # TODO: Get from authenticated user
+        )
+        prompt_ids.append(prompt.id)
+    prompt_ids = list(dict.fromkeys(prompt_ids))
+
+    if not prompt_ids:
+        raise HTTPException(status_code=400, detail="At least one prompt is required")
+    if len(prompt_ids) * len(video_urls) > settings.JOB_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A job can contain at most {settings.JOB_MAX_ITEMS} prompt/video pairs"
+        )
+
+    job = crud_job.create_with_items(
+        db,
+        prompt_ids=prompt_ids,
+        video_urls=list(video_urls.values()),
+        user_id=1  # TODO: Get from authenticated user
+    )
+    return _progress(db, job)
+
+@router.get("/{job_id}", response_model=job_schema.JobProgress)
+def get_job(
+    *,
+    db: Session = Depends(deps.get_db),
+    job_id: str
+) -> job_schema.JobProgress:
+    """
+    Get job progress by ID.
+    """
+    job = crud_job.get(db, id=job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _progress(db, job)
@@ -1,17 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from pydantic import BaseModel
+from typing import AsyncIterator, List, Dict, Any, Literal, Optional, Tuple
+from pydantic import BaseModel, Field
 from app.api import deps
+from app.core.config import settings
 from app.schemas import prompt as prompt_schema
-from app.services import llm_service, youtube_service
-from app.crud import crud_prompt, crud_video
-from app.services.llm_service import run_prompt
-from app.db.models.video import Video
-from app.db.models.prompt import Prompt
-from app.db.models.output import Output
-import uuid
-import time
+from app.schemas.pagination import Page
+from app.services import llm_service, prompt_runner
+from app.services.quota import QuotaExceededError
+from app.crud import async_crud_output, async_crud_prompt, crud_prompt, crud_video
+from starlette.concurrency import run_in_threadpool
 import json
 
 router = APIRouter()
@@ -21,6 +21,24 @@ class RunPromptRequest(BaseModel):
     prompt: str
     promptId: str | None = None
 
+class RunBatchRequest(BaseModel):
+    videoUrls: List[str] = Field(..., min_length=1)
+    prompt: str
+    promptId: str | None = None
+    concurrency: int | None = Field(None, ge=1)
+
+async def _ndjson(items: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    async for item in items:
+        yield json.dumps(item) + "\n"
+
+async def _sse(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    except Exception as e:
+        # Headers are already sent, so report failures in-band
+        yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
 @router.post("/", response_model=prompt_schema.Prompt)
 def create_prompt(
     *,
@@ -52,21 +70,21 @@ def create_prompt(
     return prompt
 
 @router.get("/{prompt_id}", response_model=prompt_schema.Prompt)
-def get_prompt(
+async def get_prompt(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     prompt_id: str
 ) -> prompt_schema.Prompt:
     """
     Get prompt by ID.
     """
-    prompt = crud_prompt.get(db, id=prompt_id)
+    prompt = await async_crud_prompt.get_with_outputs(db, id=prompt_id)
     if not prompt:
         raise HTTPException(status_code=404, detail="Prompt not found")
     return prompt
 
 @router.post("/run_prompt", response_model=Dict[str, Any])
-def run_prompt_endpoint(
+async def run_prompt_endpoint(
     *,
     db: Session = Depends(deps.get_db),
     request: RunPromptRequest
@@ -75,112 +93,142 @@ def run_prompt_endpoint(
   Run a prompt on a video and return the LLM response.
   If promptId is provided and there's an existing output for the video, return that instead.
   """
-  # Extract YouTube ID from URL
   try:
-    video_id = youtube_service.extract_video_id(request.videoUrl)
-  except ValueError as e:
+    return await prompt_runner.run_prompt(
+      db,
+      video_url=request.videoUrl,
+      prompt_text=request.prompt,
+      prompt_id=request.promptId
+    )
+  except prompt_runner.PromptNotFoundError as e:
+    raise HTTPException(status_code=404, detail=str(e))
+  except QuotaExceededError as e:
     raise HTTPException(
-      status_code=400,
-      detail=f"Invalid YouTube URL: {str(e)}"
+      status_code=429, detail=str(e), headers={"Retry-After": str(int(e.retry_after))}
     )
+  except ValueError as e:
+    raise HTTPException(status_code=400, detail=str(e))
 
-  # Create or get video
-  video = db.query(Video).filter(Video.youtube_id == video_id).first()
-  if not video:
-    # Fetch video metadata from YouTube
+@router.post("/run_prompt/stream")
+async def run_prompt_stream_endpoint(
+    *,
+    db: Session = Depends(deps.get_db),
+    request: RunPromptRequest
+) -> StreamingResponse:
+    """
+    Run a prompt on a video and stream the LLM response as Server-Sent Events.
+
+    Sends "chunk" events with text as it is generated, then a "done" event
+    with the same body as /run_prompt, or an "error" event on failure.
+    """
     try:
-      video_metadata = youtube_service.get_video_metadata(request.videoUrl)
-      
-      video = Video(
-          youtube_id=video_id,
-          title=video_metadata["title"],
-          description=video_metadata.get("description", ""),
-          video_metadata=video_metadata,
-          user_id=1  # TODO: Get from authenticated user
-      )
-      db.add(video)
-      db.flush()  # Flush to get the video ID
-    except Exception as e:
-      raise HTTPException(
-        status_code=400,
-        detail=f"Failed to fetch video metadata: {str(e)}"
-      )
-
-  # Check for existing output
-  existing_output = None
-  if request.promptId:
-    # Check by prompt ID
-    existing_output = db.query(Output).filter(
-      Output.prompt_id == request.promptId,
-      Output.video_id == video.id
-    ).first()
-  else:
-    # Check by prompt text
-    existing_prompt = db.query(Prompt).filter(
-      Prompt.user_prompt == request.prompt
-    ).first()
-    if existing_prompt:
-      existing_output = db.query(Output).filter(
-        Output.prompt_id == existing_prompt.id,
-        Output.video_id == video.id
-      ).first()
-  
-  if existing_output:
-    return {
-      "promptId": existing_output.prompt_id,
-      "output": json.loads(existing_output.llm_output)
-    }
-
-  # Get or create prompt
-  prompt = None
-  if request.promptId:
-    prompt = db.query(Prompt).filter(Prompt.id == request.promptId).first()
-    if not prompt:
-      raise HTTPException(status_code=404, detail="Prompt not found")
-  else:
-    # Create new prompt
-    prompt = Prompt(
-      id=str(uuid.uuid4()),
-      system_prompt="",  # TODO: Add system prompt if needed
-      user_prompt=request.prompt,
-      user_id=1  # TODO: Get from authenticated user
+        prepared = await prompt_runner.prepare_run_async(
+            db,
+            video_url=request.videoUrl,
+            prompt_text=request.prompt,
+            prompt_id=request.promptId
+        )
+    except prompt_runner.PromptNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(int(e.retry_after))}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        _sse(prompt_runner.stream_prompt(
+            prepared,
+            video_url=request.videoUrl,
+            prompt_text=request.prompt,
+            prompt_id=request.promptId
+        )),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    db.add(prompt)
-    db.flush()
-
-  # Run the prompt and measure time
-  start_time = time.time()
-  output = llm_service.run_prompt(
-    video_url=request.videoUrl,
-    prompt=request.prompt
-  )
-  time_taken = time.time() - start_time
-
-  # Create output record
-  output_record = Output(
-    id=str(uuid.uuid4()),
-    video_id=video.id,
-    prompt_id=prompt.id,
-    llm_output=json.dumps(output),  # Convert dict to JSON string
-    time_to_generate=time_taken
-  )
-  db.add(output_record)
-  db.commit()
-
-  return {
-    "promptId": prompt.id,
-    "output": output
-  }
-
-@router.get("/", response_model=List[prompt_schema.Prompt])
-def get_prompts(
+
+@router.post("/run_batch")
+async def run_batch_endpoint(
     *,
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100
-) -> List[prompt_schema.Prompt]:
+    request: RunBatchRequest
+) -> StreamingResponse:
+    """
+    Run one prompt against many videos.
+
+    Streams newline-delimited JSON, one object per video, in completion order.
+    Videos that already have an output are returned first without an LLM call.
+    """
+    if len(request.videoUrls) > settings.BATCH_RUN_MAX_VIDEOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {settings.BATCH_RUN_MAX_VIDEOS} videos"
+        )
+    concurrency = min(
+        request.concurrency or settings.BATCH_RUN_CONCURRENCY,
+        settings.BATCH_RUN_MAX_CONCURRENCY
+    )
+
+    try:
+        plan = await run_in_threadpool(
+            prompt_runner.plan_batch,
+            db,
+            video_urls=request.videoUrls,
+            prompt_text=request.prompt,
+            prompt_id=request.promptId
+        )
+    except prompt_runner.PromptNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return StreamingResponse(
+        _ndjson(prompt_runner.run_batch(plan, concurrency=concurrency)),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/", response_model=Page[prompt_schema.PromptSummary])
+async def get_prompts(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    include: Optional[Literal["outputs"]] = None,
+    outputs_limit: int = Query(5, ge=1, le=50)
+) -> Page[prompt_schema.PromptSummary]:
     """
-    Get all prompts.
+    Get prompts, newest first, one page at a time.
+
+    Each prompt carries its output count and last run date. With
+    include=outputs it also carries its `outputs_limit` most recent outputs.
     """
-    prompts = db.query(Prompt).offset(skip).limit(limit).all()
-    return prompts 
\ No newline at end of file
+    try:
+        prompts, next_cursor = await async_crud_prompt.get_page(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Fixed query count per page: never touch the lazy Prompt.outputs relationship
+    prompt_ids = [prompt.id for prompt in prompts]
+    summaries = await async_crud_output.get_summaries(db, prompt_ids=prompt_ids)
+    outputs = (
+        await async_crud_output.get_latest_for_prompts(db, prompt_ids=prompt_ids, limit=outputs_limit)
+        if include == "outputs" else None
+    )
+
+    items = []
+    for prompt in prompts:
+        output_count, last_run_date = summaries.get(prompt.id, (0, None))
+        items.append(prompt_schema.PromptSummary(
+            id=prompt.id,
+            system_prompt=prompt.system_prompt,
+            user_prompt=prompt.user_prompt,
+            user_id=prompt.user_id,
+            created_at=prompt.created_at,
+            updated_at=prompt.updated_at,
+            output_count=output_count,
+            last_run_date=last_run_date,
+            outputs=(
+                [prompt_schema.Output.model_validate(output) for output in outputs.get(prompt.id, [])]
+                if outputs is not None else None
+            )
+        ))
+    return Page(items=items, next_cursor=next_cursor, has_more=next_cursor is not None)
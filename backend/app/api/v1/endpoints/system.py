@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Any, Dict, Literal, Optional
+from app.core import profiling
+from app.db import pool
+from app.db.database import engine
+from app.services import llm_service, quota
+
+router = APIRouter()
+
+@router.get("/limits", response_model=Dict[str, Any])
+def get_limits() -> Dict[str, Any]:
+    """
+    Live state of the outbound rate limiters and today's YouTube quota usage.
+    """
+    return {
+        "gemini": llm_service.limiter.snapshot(),
+        "youtube_quota": quota.usage()
+    }
+
+@router.get("/db_pool", response_model=Dict[str, Any])
+def get_db_pool() -> Dict[str, Any]:
+    """
+    Connection pool configuration, checkout wait times and connections in use.
+    """
+    return pool.snapshot(engine)
+
+@router.get("/profiles/{profile_id}", response_model=None)
+def get_profile(
+    profile_id: str,
+    format: Literal["json", "folded"] = Query("json"),
+    x_profile: Optional[str] = Header(None)
+) -> Any:
+    """
+    Report for a request profiled with X-Profile, by its X-Profile-Id.
+
+    "folded" returns the sampled stacks for flamegraph.pl or speedscope.
+    Requires the same X-Profile header as the profiled request.
+    """
+    report = profiling.reports.get(profile_id) if profiling.is_authorized(x_profile) else None
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse(profiling.folded(report))
+    return report
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Literal, Optional
+from datetime import datetime
+from app.api import deps
+from app.core.config import settings
+from app.schemas import usage as usage_schema
+from app.crud import crud_output
+
+router = APIRouter()
+
+def _estimated_cost(row: Dict[str, Any]) -> float:
+    # Cached and audio tokens are billed at their own rates and are part of prompt_tokens
+    text_tokens = max(row["prompt_tokens"] - row["audio_tokens"] - row["cached_tokens"], 0)
+    cost = (
+        text_tokens * settings.GEMINI_INPUT_PRICE_PER_MILLION
+        + row["audio_tokens"] * settings.GEMINI_AUDIO_INPUT_PRICE_PER_MILLION
+        + row["cached_tokens"] * settings.GEMINI_CACHED_INPUT_PRICE_PER_MILLION
+        + row["output_tokens"] * settings.GEMINI_OUTPUT_PRICE_PER_MILLION
+    )
+    return round(cost / 1_000_000, 6)
+
+@router.get("/", response_model=List[usage_schema.UsageStats])
+def get_usage(
+    *,
+    db: Session = Depends(deps.get_db),
+    group_by: Literal["prompt", "model", "day"] = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    model: Optional[str] = None,
+    prompt_id: Optional[str] = None
+) -> List[usage_schema.UsageStats]:
+    """
+    Gemini token usage, estimated cost and generation time percentiles.
+    """
+    rows = crud_output.get_usage_stats(
+        db, group_by=group_by, start=start, end=end, model=model, prompt_id=prompt_id
+    )
+    return [
+        usage_schema.UsageStats(**row, estimated_cost_usd=_estimated_cost(row))
+        for row in rows
+    ]
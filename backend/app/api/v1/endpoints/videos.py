@@ -1,13 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Sequence
 from app.api import deps
+from app.core.config import settings
 from app.schemas import video as video_schema
+from app.schemas.pagination import Page
 from app.services import youtube_service
-from app.crud import crud_video
+from app.services.quota import QuotaExceededError, QuotaPriority
+from app.crud import async_crud_video, crud_video
+from app.db.models.video import Video
 
 router = APIRouter()
 
+def _parse_fields(fields: Optional[str], default: Sequence[str]) -> List[str]:
+    if not fields:
+        return list(default)
+    requested = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in video_schema.VIDEO_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {unknown}; choose from {', '.join(video_schema.VIDEO_FIELDS)}"
+        )
+    return requested
+
+def _sparse(video, fields: List[str]) -> video_schema.VideoFields:
+    return video_schema.VideoFields(**{name: getattr(video, name) for name in fields})
+
 @router.post("/", response_model=video_schema.Video)
 def create_video(
     *,
@@ -23,7 +43,7 @@ def create_video(
         return video
     
     # Get video metadata from YouTube
-    video_metadata = youtube_service.get_video_metadata(str(video_in.url))
+    video_metadata = youtube_service.get_video_metadata(str(video_in.url), db=db)
     
     # Create video in database
     video = crud_video.create(db, obj_in=video_schema.VideoCreate(
@@ -35,29 +55,115 @@ def create_video(
     ))
     return video
 
-@router.get("/{video_id}", response_model=video_schema.Video)
-def get_video(
+@router.post("/bulk", response_model=video_schema.VideoBulkResult)
+def create_videos_bulk(
     *,
     db: Session = Depends(deps.get_db),
-    video_id: str
-) -> video_schema.Video:
+    videos_in: video_schema.VideoBulkCreate
+) -> video_schema.VideoBulkResult:
     """
-    Get video by ID.
+    Import many videos, fetching metadata in batches of up to 50 ids per API call.
     """
-    video = crud_video.get(db, id=video_id)
+    if len(videos_in.urls) > settings.VIDEO_BULK_MAX_URLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.VIDEO_BULK_MAX_URLS} URLs can be imported at once"
+        )
+
+    errors = {}
+    urls_by_id = {}
+    for url in videos_in.urls:
+        try:
+            urls_by_id.setdefault(youtube_service.extract_video_id(url), url)
+        except ValueError as e:
+            errors[url] = str(e)
+
+    # Videos we already have need no metadata at all
+    existing = {
+        video.youtube_id: video
+        for video in crud_video.get_multi_by_youtube_ids(db, youtube_ids=list(urls_by_id), details=True)
+    }
+    to_fetch = [url for youtube_id, url in urls_by_id.items() if youtube_id not in existing]
+    try:
+        metadata_by_id = youtube_service.get_video_metadata_bulk(
+            to_fetch, db=db, priority=QuotaPriority.BULK
+        )
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=429, detail=str(e), headers={"Retry-After": str(int(e.retry_after))}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Failed to fetch video metadata: {str(e)}")
+
+    if metadata_by_id:
+        crud_video.create_many_from_metadata(
+            db,
+            metadata_by_id=metadata_by_id,
+            user_id=1  # TODO: Get from authenticated user
+        )
+        # The commit expired the rows loaded above; reload them all in one query
+        existing = {
+            video.youtube_id: video
+            for video in crud_video.get_multi_by_youtube_ids(
+                db, youtube_ids=list(urls_by_id), details=True
+            )
+        }
+
+    videos = []
+    for youtube_id, url in urls_by_id.items():
+        video = existing.get(youtube_id)
+        if video:
+            videos.append(video)
+        else:
+            errors[url] = "Video not found or not accessible"
+    return video_schema.VideoBulkResult(videos=videos, errors=errors)
+
+@router.get(
+    "/{video_id}", response_model=video_schema.VideoFields, response_model_exclude_unset=True
+)
+async def get_video(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    video_id: int,
+    fields: Optional[str] = None
+) -> video_schema.VideoFields:
+    """
+    Get video by ID. `fields` is a comma-separated list of columns to return (default: all).
+    """
+    names = _parse_fields(fields, video_schema.VIDEO_FIELDS)
+    result = await db.execute(
+        async_crud_video.select_fields(fields=names).where(Video.id == video_id)
+    )
+    video = result.scalars().first()
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
-    return video 
+    return _sparse(video, names)
 
-@router.get("/", response_model=List[video_schema.Video])
-def get_videos(
+@router.get(
+    "/", response_model=Page[video_schema.VideoFields], response_model_exclude_unset=True
+)
+async def get_videos(
     *,
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100
-) -> List[video_schema.Video]:
+    db: AsyncSession = Depends(deps.get_async_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    fields: Optional[str] = None
+) -> Page[video_schema.VideoFields]:
     """
-    Get all videos.
+    Get videos, newest first, one page at a time.
+
+    `fields` is a comma-separated list of columns to return. By default the
+    large description and video_metadata columns are left out.
     """
-    videos = crud_video.get_multi(db, skip=skip, limit=limit)
-    return videos 
\ No newline at end of file
+    names = _parse_fields(fields, video_schema.VIDEO_LIST_FIELDS)
+    try:
+        videos, next_cursor = await async_crud_video.get_page(
+            db, cursor=cursor, limit=limit, statement=async_crud_video.select_fields(fields=names)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Page(
+        items=[_sparse(video, names) for video in videos],
+        next_cursor=next_cursor,
+        has_more=next_cursor is not None
+    )
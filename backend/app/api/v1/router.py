@@ -1,6 +1,9 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import videos, prompts
+from app.api.v1.endpoints import videos, prompts, jobs, system, usage
  
 api_router = APIRouter()
 api_router.include_router(videos.router, prefix="/videos", tags=["videos"])
-api_router.include_router(prompts.router, prefix="/prompts", tags=["prompts"]) 
\ No newline at end of file
+api_router.include_router(prompts.router, prefix="/prompts", tags=["prompts"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
+api_router.include_router(usage.router, prefix="/usage", tags=["usage"])
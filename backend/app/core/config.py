@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl, validator
 
@@ -27,9 +27,88 @@ class Settings(BaseSettings):
             return v
         return values.get("DATABASE_URL")
     
+    # Async engine URL; derived from SQLALCHEMY_DATABASE_URI (asyncpg / aiosqlite) when unset
+    ASYNC_DATABASE_URI: str | None = None
+    
+    # Connection pool. "queue" keeps up to DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # connections open (long-running servers and workers); "null" opens one per
+    # checkout and closes it on release (serverless, or behind PgBouncer)
+    DB_POOL_CLASS: Literal["queue", "null"] = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a pooled connection is replaced; -1 never
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout; costs a round trip each time
+    DB_BULK_CHUNK_SIZE: int = 1000  # Rows per statement in CRUDBase bulk operations
+    
     # LLM Configuration
     GEMINI_API_KEY: str = ""
+    GEMINI_MODEL: str = "gemini-2.0-flash"
+
+    # Outbound Gemini limiter: request/token budgets, AIMD concurrency, retries
+    GEMINI_RPM_LIMIT: int = 2000  # 0 disables the requests-per-minute budget
+    GEMINI_TPM_LIMIT: int = 4000000  # 0 disables the tokens-per-minute budget
+    GEMINI_TOKENS_PER_CALL_ESTIMATE: int = 20000  # Reserved up front, reconciled with usage_metadata
+    GEMINI_INITIAL_CONCURRENCY: int = 16
+    GEMINI_MIN_CONCURRENCY: int = 1
+    GEMINI_MAX_CONCURRENCY: int = 256
+    GEMINI_AIMD_DECREASE: float = 0.5  # Concurrency multiplier on a 429
+    GEMINI_AIMD_INCREASE: float = 1.0  # Concurrency added per window of successful calls
+    GEMINI_MAX_RETRIES: int = 4
+    GEMINI_RETRY_BASE_DELAY: float = 1.0
+    GEMINI_RETRY_MAX_DELAY: float = 60.0
+
+    # Gemini list prices in USD per million tokens, used for usage cost estimates
+    GEMINI_INPUT_PRICE_PER_MILLION: float = 0.10  # Text, image and video input
+    GEMINI_AUDIO_INPUT_PRICE_PER_MILLION: float = 0.70
+    GEMINI_CACHED_INPUT_PRICE_PER_MILLION: float = 0.025
+    GEMINI_OUTPUT_PRICE_PER_MILLION: float = 0.40
+
     YOUTUBE_API_KEY: str = ""
+
+    # YouTube metadata cache: in-process LRU in front of videos.video_metadata
+    YOUTUBE_METADATA_MAX_AGE: float = 7 * 24 * 3600  # Default staleness accepted by get_video_metadata
+    YOUTUBE_METADATA_CACHE_SIZE: int = 2048
+    YOUTUBE_METADATA_CACHE_TTL: float = 3600
+    YOUTUBE_BATCH_SIZE: int = 50  # Ids per videos.list / channels.list call (API maximum is 50)
+    YOUTUBE_HTTP_TIMEOUT: float = 30.0
+    VIDEO_BULK_MAX_URLS: int = 5000
+
+    # YouTube Data API quota, tracked per Pacific-time day in api_quota_usage
+    YOUTUBE_DAILY_QUOTA: int = 10000
+    YOUTUBE_QUOTA_BACKGROUND_SHARE: float = 0.8  # Share of the daily quota job workers may use
+    YOUTUBE_QUOTA_BULK_SHARE: float = 0.6  # Share of the daily quota bulk imports and batches may use
+    YOUTUBE_RETRY_BASE_DELAY: float = 1.0
+    YOUTUBE_RETRY_MAX_DELAY: float = 30.0
+
+    # Single-flight coordination for identical (video, prompt, model) runs
+    RUN_CLAIM_TTL: int = 300  # Seconds before an unfinished claim is considered abandoned
+    RUN_CLAIM_POLL_INTERVAL: float = 1.0  # Seconds between checks while another worker runs
+
+    # LLM output storage: documents larger than this many bytes of JSON are stored
+    # zlib-compressed. TOAST leaves values under about 2 KB uncompressed
+    LLM_OUTPUT_COMPRESS_THRESHOLD: int = 2048
+
+    # Per-request profiling: requests sent with "X-Profile: <PROFILING_TOKEN>" are
+    # sampled and SQL-traced; reports are served by /api/system/profiles/{id}
+    PROFILING_TOKEN: str = ""  # Empty disables profiling unless PROFILING_DEBUG is set
+    PROFILING_DEBUG: bool = False  # Accept any X-Profile value; local development only
+    PROFILING_SAMPLE_INTERVAL: float = 0.005  # Seconds between stack samples
+    PROFILING_MAX_REPORTS: int = 50  # Reports kept in memory per process
+    PROFILING_REPORT_TTL: float = 3600
+
+    # Batch runs
+    BATCH_RUN_CONCURRENCY: int = 8  # Default concurrent metadata fetches / LLM calls per batch
+    BATCH_RUN_MAX_CONCURRENCY: int = 64
+    BATCH_RUN_MAX_VIDEOS: int = 1000
+
+    # Job queue and worker (python -m app.worker)
+    JOB_MAX_ITEMS: int = 100000
+    JOB_ITEM_LEASE: int = 900  # Seconds before a running item from a dead worker is reclaimed
+    JOB_ITEM_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 30.0  # Base seconds for exponential retry backoff
+    WORKER_CONCURRENCY: int = 4  # Items processed in parallel per worker process
+    WORKER_POLL_INTERVAL: float = 2.0
     
     class Config:
         case_sensitive = True
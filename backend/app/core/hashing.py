@@ -0,0 +1,32 @@
+import hashlib
+from typing import Optional
+
+def normalize_prompt(text: str) -> str:
+    """
+    Normalize prompt text so prompts differing only in whitespace compare equal.
+    """
+    return " ".join(text.split())
+
+def prompt_hash(user_prompt: str, system_prompt: Optional[str] = None) -> str:
+    """
+    SHA-256 hex digest of the normalized prompt content.
+
+    A missing or empty system prompt hashes the same as the user prompt alone.
+    """
+    content = normalize_prompt(user_prompt)
+    if system_prompt and system_prompt.strip():
+        content = normalize_prompt(system_prompt) + "\0" + content
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def run_key(youtube_id: str, prompt: str, model: str) -> str:
+    """
+    Key identifying one (video, prompt, model) LLM run.
+    """
+    raw = "\0".join([youtube_id, normalize_prompt(prompt), model])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def video_claim_key(youtube_id: str) -> str:
+    """
+    Key identifying the creation of one video row; never collides with run_key().
+    """
+    return f"video:{youtube_id}"
@@ -0,0 +1,301 @@
+"""
+In-process metrics, served by GET /metrics in the Prometheus text format.
+
+Counters and histograms are kept in memory per process; there is no client
+library or push gateway. MetricsMiddleware times every request by route
+template and attributes the SQL queries it issues (counted by engine events,
+see track_queries) to that request, including queries run in the threadpool.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import bisect
+import math
+import threading
+import time
+
+# Seconds; covers fast cached responses up to multi-minute LLM runs
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+Labels = Dict[str, str]
+Sample = Tuple[str, Labels, float]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_sample(name: str, labels: Labels, value: float) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+    pairs = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+    return f"{name}{{{pairs}}} {_format_value(value)}"
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        for key, counts, total in series:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+class _Collector:
+    """
+    Metric whose samples are read at scrape time from state kept elsewhere.
+    """
+    def __init__(self, name: str, documentation: str, type: str, collect: Callable[[], Iterable[Tuple[Labels, float]]]):
+        self.name = name
+        self.documentation = documentation
+        self.type = type
+        self._collect = collect
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self._collect():
+            yield self.name, labels, value
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Any) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(
+        self, name: str, documentation: str, type: str,
+        collect: Callable[[], Iterable[Tuple[Labels, float]]]
+    ) -> None:
+        """
+        Register a gauge or counter computed on each scrape by `collect`,
+        which returns (labels, value) pairs.
+        """
+        self._register(_Collector(name, documentation, type, collect))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(_format_sample(*sample) for sample in metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Time to serve an HTTP request, until the response body is sent.",
+    ("method", "route", "status")
+)
+http_request_db_queries = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed while serving one HTTP request.",
+    ("route",), buckets=COUNT_BUCKETS
+)
+http_request_db_duration = registry.histogram(
+    "http_request_db_duration_seconds",
+    "Total SQL execution time while serving one HTTP request.",
+    ("route",)
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "Execution time of single SQL statements, in requests and elsewhere.",
+    buckets=QUERY_BUCKETS
+)
+external_call_duration = registry.histogram(
+    "external_call_duration_seconds",
+    "Latency of YouTube and Gemini API calls, per attempt, by outcome.",
+    ("service", "operation", "outcome")
+)
+output_cache_lookups = registry.counter(
+    "output_cache_lookups_total",
+    "Prompt runs by how their output was obtained: hit (stored output), "
+    "coalesced (shared a concurrent identical run) or miss (new LLM call).",
+    ("result",)
+)
+
+class RequestStats:
+    """SQL work attributed to the request being served."""
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+# Set by MetricsMiddleware. The object is shared, not copied, with the
+# threadpool tasks the request starts, so their queries are counted too.
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info["query_started"] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.pop("query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    db_query_duration.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+
+def track_queries(engine: Engine) -> None:
+    """
+    Time every SQL statement executed through `engine` (the sync engine of
+    an AsyncEngine for async sessions).
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+@contextmanager
+def external_call(service: str, operation: str) -> Iterator[None]:
+    """
+    Time one call to an external API; an exception marks it as an error.
+    Works around awaited calls as well.
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        external_call_duration.observe(
+            time.perf_counter() - start, service=service, operation=operation, outcome=outcome
+        )
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    # Set by the router on a match; templates keep label cardinality bounded.
+    # Newer FastAPI releases match included routers without copying their
+    # routes, so scope["route"] carries the router-relative path and the full
+    # template (include prefixes plus path_format) is on the matched context
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    template = getattr(context, "path_format", None)
+    if template:
+        return template
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency and per-request SQL work.
+
+    Pure ASGI rather than BaseHTTPMiddleware, so streamed responses are timed
+    until their last chunk and the request context reaches the endpoint.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500  # Unless a response starts, the exception becomes a 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            route = _route_template(scope)
+            http_request_duration.observe(elapsed, method=scope["method"], route=route, status=status)
+            http_request_db_queries.observe(stats.queries, route=route)
+            http_request_db_duration.observe(stats.query_seconds, route=route)
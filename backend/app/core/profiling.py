@@ -0,0 +1,208 @@
+"""
+Opt-in profiling of single requests.
+
+A request carrying `X-Profile: <PROFILING_TOKEN>` (or any X-Profile header
+when PROFILING_DEBUG is set) is sampled by a background thread and has every
+SQL statement it executes traced through engine events (see trace_queries).
+The response gets a Server-Timing header and an X-Profile-Id; the full report
+(SQL trace and folded stacks for flame graph tools) is kept in memory and
+served by GET /api/system/profiles/{id}.
+
+Without the header the cost is one header scan per request and one context
+variable lookup per SQL statement.
+"""
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from app.core.cache import LRUCache
+from app.core.config import settings
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+
+PROFILE_HEADER = "X-Profile"
+
+# Leaf frames in these files are threads waiting for work, not doing any
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py", os.path.join("concurrent", "futures", "thread.py"))
+
+reports: LRUCache[Dict[str, Any]] = LRUCache(maxsize=settings.PROFILING_MAX_REPORTS, ttl=settings.PROFILING_REPORT_TTL)
+
+def is_authorized(value: Optional[str]) -> bool:
+    """
+    Whether an X-Profile header value may profile requests and read reports.
+    """
+    if value is None:
+        return False
+    if settings.PROFILING_DEBUG:
+        return True
+    return bool(settings.PROFILING_TOKEN) and hmac.compare_digest(value, settings.PROFILING_TOKEN)
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+def _is_idle(frame) -> bool:
+    return frame.f_code.co_filename.endswith(_IDLE_FILES)
+
+class _Sampler(threading.Thread):
+    """
+    Records the stacks of every busy thread each `interval` seconds.
+
+    Threadpool work for a request runs on shared threads, so samples from
+    concurrent requests are included too; profile when traffic is low, or
+    read the stacks under the endpoint of interest.
+    """
+    def __init__(self, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        while not self._done.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident != own and not _is_idle(frame):
+                    self.stacks[_fold(frame)] += 1
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+class Profile:
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.status: Optional[int] = None
+        self.queries: List[Dict[str, Any]] = []
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+        self._sampler = _Sampler(settings.PROFILING_SAMPLE_INTERVAL)
+        self._sampler.start()
+
+    def _elapsed_ms(self, until: float) -> float:
+        return round((until - self._start) * 1000, 3)
+
+    def record_query(self, statement: str, started: float, rows: int, executemany: bool) -> None:
+        self.queries.append({
+            "statement": statement,
+            "start_ms": self._elapsed_ms(started),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "rows": rows,
+            "executemany": executemany,
+        })
+
+    def db_ms(self) -> float:
+        return round(sum(query["duration_ms"] for query in self.queries), 3)
+
+    def server_timing(self) -> str:
+        # Taken when the response starts; a streamed body is only in the report
+        total = self._elapsed_ms(time.perf_counter())
+        return (
+            f'app;dur={total}, db;dur={self.db_ms()};desc="{len(self.queries)} queries", '
+            f'profile;desc="{self.id}"'
+        )
+
+    def finish(self) -> None:
+        self._end = time.perf_counter()
+        self._sampler.stop()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": self._elapsed_ms(self._end or time.perf_counter()),
+            "db": {"queries": len(self.queries), "duration_ms": self.db_ms()},
+            "sql": self.queries,
+            "profile": {
+                "interval_ms": settings.PROFILING_SAMPLE_INTERVAL * 1000,
+                "samples": self._sampler.samples,
+                "stacks": [
+                    {"stack": stack, "count": count}
+                    for stack, count in self._sampler.stacks.most_common()
+                ],
+            },
+        }
+
+def folded(report: Dict[str, Any]) -> str:
+    """
+    A report's stacks in the folded format read by flamegraph.pl and speedscope.
+    """
+    return "".join(f"{item['stack']} {item['count']}\n" for item in report["profile"]["stacks"])
+
+# The profile of the request being served, shared with its threadpool tasks
+_active: ContextVar[Optional[Profile]] = ContextVar("profile", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active.get() is not None:
+        conn.info["profile_query_started"] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _active.get()
+    if profile is None:
+        return
+    started = conn.info.pop("profile_query_started", None)
+    if started is not None:
+        # Parameters are left out; they may hold user data
+        profile.record_query(statement, started, cursor.rowcount, executemany)
+
+def trace_queries(engine: Engine) -> None:
+    """
+    Record the SQL statements of profiled requests executed through `engine`.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def _profile_requested(scope: Dict[str, Any]) -> bool:
+    if not (settings.PROFILING_TOKEN or settings.PROFILING_DEBUG):
+        return False
+    header = PROFILE_HEADER.lower().encode("latin-1")
+    for name, value in scope["headers"]:
+        if name == header:
+            return is_authorized(value.decode("latin-1"))
+    return False
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests that ask for it with X-Profile.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"])
+        token = _active.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing())
+                headers.append("X-Profile-Id", profile.id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _active.reset(token)
+            profile.finish()
+            reports.set(profile.id, profile.report())
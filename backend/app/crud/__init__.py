@@ -1,2 +1,4 @@
-from app.crud.crud_prompt import crud_prompt
-from app.crud.crud_video import crud_video 
\ No newline at end of file
+from app.crud.crud_output import crud_output, async_crud_output
+from app.crud.crud_prompt import crud_prompt, async_crud_prompt
+from app.crud.crud_video import crud_video, async_crud_video
+from app.crud.crud_job import crud_job
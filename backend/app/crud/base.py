@@ -1,9 +1,14 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
 
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
 from app.db.base_class import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -29,6 +34,35 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
 
+    def get_page(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        query: Optional[Query] = None
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Keyset pagination, newest first, ordered by (created_at, id).
+
+        Each page seeks straight to its position on the (created_at, id)
+        index, so deep pages cost the same as the first one, and rows
+        inserted while paging never shift later pages. Requires a model
+        with a non-null created_at column.
+
+        Returns:
+            The rows and the cursor for the next page (None on the last page)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        if query is None:
+            query = db.query(self.model)
+        if cursor:
+            query = query.filter(_after_cursor(self.model, cursor))
+        rows = query.order_by(*_page_order(self.model)).limit(limit + 1).all()
+        return _split_page(rows, limit)
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
@@ -44,12 +78,12 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
+        columns = self.model.__table__.columns.keys()
+        for field in columns:
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         db.add(db_obj)
@@ -61,4 +95,226 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj = db.query(self.model).get(id)
         db.delete(obj)
         db.commit()
+        return obj
+
+    def create_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        chunk_size: Optional[int] = None,
+        refresh: bool = False
+    ) -> Optional[List[ModelType]]:
+        """
+        Insert many rows with batched multi-row INSERTs and a single commit.
+
+        Args:
+            objs_in: Schemas or dicts; keys that are not columns are ignored
+            chunk_size: Rows per INSERT statement (default DB_BULK_CHUNK_SIZE)
+            refresh: Return the inserted objects
+
+        Returns:
+            The inserted objects if refresh is set, else None
+        """
+        statement = insert(self.model)
+        return self._execute_chunked(db, statement, self._rows(objs_in), chunk_size, refresh)
+
+    def upsert_many(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        index_elements: Sequence[str],
+        update_fields: Optional[Sequence[str]] = None,
+        chunk_size: Optional[int] = None,
+        refresh: bool = False
+    ) -> Optional[List[ModelType]]:
+        """
+        INSERT ... ON CONFLICT on Postgres and SQLite, chunked, with a single commit.
+
+        Args:
+            index_elements: Columns of the unique index that detects conflicts
+            update_fields: Columns overwritten on conflict; defaults to every
+                provided non-key column. Pass [] to leave existing rows untouched
+                (ON CONFLICT DO NOTHING)
+            refresh: Return the inserted or updated objects. Rows skipped
+                by DO NOTHING are not returned
+
+        Raises:
+            NotImplementedError: On databases without ON CONFLICT
+        """
+        statement = self._insert_on_conflict(db)
+        rows = self._rows(objs_in)
+        # A statement may not touch the same row twice; the last occurrence wins
+        rows = list({tuple(row.get(key) for key in index_elements): row for row in rows}.values())
+        if update_fields is None:
+            update_fields = sorted({key for row in rows for key in row} - set(index_elements))
+        if update_fields:
+            statement = statement.on_conflict_do_update(
+                index_elements=list(index_elements),
+                set_={field: statement.excluded[field] for field in update_fields}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=list(index_elements))
+        return self._execute_chunked(db, statement, rows, chunk_size, refresh)
+
+    def update_many(
+        self,
+        db: Session,
+        *,
+        values: Sequence[Dict[str, Any]],
+        chunk_size: Optional[int] = None
+    ) -> None:
+        """
+        Update many rows by primary key with executemany UPDATEs and a single commit.
+
+        Each dict holds the row's primary key and the columns to change.
+        """
+        self._execute_chunked(db, update(self.model), self._rows(values), chunk_size, False)
+
+    def _insert_on_conflict(self, db: Session) -> Any:
+        """
+        Dialect-specific INSERT that supports on_conflict_do_update / _do_nothing.
+
+        Raises:
+            NotImplementedError: On databases without ON CONFLICT
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(self.model)
+        if dialect == "sqlite":
+            return sqlite.insert(self.model)
+        raise NotImplementedError(f"ON CONFLICT is not supported on {dialect}")
+
+    def _rows(self, objs_in: Sequence[Union[BaseModel, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        columns = set(self.model.__table__.columns.keys())
+        rows = []
+        for obj_in in objs_in:
+            data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
+            rows.append({key: value for key, value in data.items() if key in columns})
+        return rows
+
+    def _execute_chunked(
+        self,
+        db: Session,
+        statement: Any,
+        rows: List[Dict[str, Any]],
+        chunk_size: Optional[int],
+        refresh: bool
+    ) -> Optional[List[ModelType]]:
+        chunk_size = chunk_size or settings.DB_BULK_CHUNK_SIZE
+        if refresh:
+            # Only the keys come back; objects are loaded after the commit,
+            # which would otherwise expire them and refresh each one separately
+            statement = statement.returning(self.model.id)
+        ids: List[Any] = []
+        try:
+            for i in range(0, len(rows), chunk_size):
+                chunk = rows[i:i + chunk_size]
+                if refresh:
+                    ids.extend(db.scalars(statement, chunk).all())
+                else:
+                    db.execute(statement, chunk)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if not refresh:
+            return None
+        objs: List[ModelType] = []
+        for i in range(0, len(ids), chunk_size):
+            objs.extend(db.query(self.model).filter(self.model.id.in_(ids[i:i + chunk_size])).all())
+        return objs
+
+
+def _after_cursor(model: Type[Base], cursor: str):
+    return tuple_(model.created_at, model.id) < tuple_(*decode_cursor(cursor))
+
+
+def _page_order(model: Type[Base]) -> tuple:
+    return model.created_at.desc(), model.id.desc()
+
+
+def _split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    # One extra row was fetched to learn whether another page follows
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    CRUDBase for AsyncSession. Same methods, awaited.
+
+    Sessions come from app.db.async_database with expire_on_commit=False, so
+    returned objects stay readable after commit; relationships and deferred
+    columns must be loaded eagerly, as lazy loads are not allowed under asyncio.
+    """
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        result = await db.execute(select(self.model).where(self.model.id == id))
+        return result.scalars().first()
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        result = await db.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        statement: Optional[Select] = None
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Keyset pagination, newest first, ordered by (created_at, id); see CRUDBase.get_page.
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        if statement is None:
+            statement = select(self.model)
+        if cursor:
+            statement = statement.where(_after_cursor(self.model, cursor))
+        result = await db.execute(statement.order_by(*_page_order(self.model)).limit(limit + 1))
+        return _split_page(list(result.scalars().all()), limit)
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        db_obj = self.model(**jsonable_encoder(obj_in))
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        columns = set(self.model.__table__.columns.keys())
+        for field, value in update_data.items():
+            if field in columns:
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: Any) -> Optional[ModelType]:
+        obj = await self.get(db, id)
+        if obj is not None:
+            await db.delete(obj)
+            await db.commit()
         return obj 
\ No newline at end of file
@@ -0,0 +1,148 @@
+from typing import Dict, List, NamedTuple, Optional
+import datetime
+import uuid
+
+from sqlalchemy import and_, func, insert, or_
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.db.models.job import Job, JobItem, JobItemStatus
+from app.db.models.prompt import Prompt
+from app.schemas.job import JobCreate
+
+
+class ClaimedItem(NamedTuple):
+    id: int
+    prompt_id: str
+    prompt_text: str
+    video_url: str
+    attempts: int
+
+
+class CRUDJob(CRUDBase[Job, JobCreate, JobCreate]):
+    def create_with_items(
+        self, db: Session, *, prompt_ids: List[str], video_urls: List[str], user_id: int
+    ) -> Job:
+        """
+        Create a job with one item per (prompt, video) pair in a single transaction.
+        """
+        job = Job(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            total_items=len(prompt_ids) * len(video_urls),
+        )
+        db.add(job)
+        db.flush()
+        rows = [
+            {
+                "job_id": job.id,
+                "prompt_id": prompt_id,
+                "video_url": video_url,
+                "status": JobItemStatus.PENDING,
+                "attempts": 0,
+            }
+            for video_url in video_urls
+            for prompt_id in prompt_ids
+        ]
+        if rows:
+            db.execute(insert(JobItem), rows)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def get_counts(self, db: Session, *, job_id: str) -> Dict[str, int]:
+        return dict(
+            db.query(JobItem.status, func.count(JobItem.id))
+            .filter(JobItem.job_id == job_id)
+            .group_by(JobItem.status)
+            .all()
+        )
+
+    def claim_items(
+        self, db: Session, *, limit: int, lease_seconds: int, max_attempts: int
+    ) -> List[ClaimedItem]:
+        """
+        Claim up to `limit` items for this worker.
+
+        Pending items are claimable once their run_after has passed; running
+        items are reclaimed once their lease expires, which is how work from
+        a crashed worker resumes. Rows locked by other workers are skipped
+        (FOR UPDATE SKIP LOCKED), so any number of workers can poll at once.
+        """
+        now = datetime.datetime.utcnow()
+        lease_expired = now - datetime.timedelta(seconds=lease_seconds)
+        items = (
+            db.query(JobItem)
+            .filter(
+                or_(
+                    and_(
+                        JobItem.status == JobItemStatus.PENDING,
+                        or_(JobItem.run_after.is_(None), JobItem.run_after <= now),
+                    ),
+                    and_(
+                        JobItem.status == JobItemStatus.RUNNING,
+                        JobItem.claimed_at < lease_expired,
+                    ),
+                )
+            )
+            .order_by(JobItem.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        claimed = []
+        prompt_texts = {}
+        for item in items:
+            if item.attempts >= max_attempts:
+                # Lease ran out on the last attempt; the worker likely died on this item
+                item.status = JobItemStatus.FAILED
+                item.error = item.error or "Worker lease expired"
+                continue
+            item.status = JobItemStatus.RUNNING
+            item.claimed_at = now
+            item.attempts += 1
+            if item.prompt_id not in prompt_texts:
+                prompt_texts[item.prompt_id] = (
+                    db.query(Prompt.user_prompt).filter(Prompt.id == item.prompt_id).scalar()
+                )
+            claimed.append(ClaimedItem(
+                item.id, item.prompt_id, prompt_texts[item.prompt_id], item.video_url, item.attempts
+            ))
+        db.commit()
+        return claimed
+
+    def complete_item(self, db: Session, *, item_id: int, output_id: Optional[str]) -> None:
+        db.query(JobItem).filter(JobItem.id == item_id).update(
+            {"status": JobItemStatus.DONE, "output_id": output_id, "error": None},
+            synchronize_session=False,
+        )
+        db.commit()
+
+    def retry_item(
+        self, db: Session, *, item_id: int, delay: float, error: Optional[str] = None,
+        count_attempt: bool = True
+    ) -> None:
+        """
+        Return a running item to the queue, claimable again after `delay` seconds.
+        """
+        values = {
+            "status": JobItemStatus.PENDING,
+            "claimed_at": None,
+            "run_after": datetime.datetime.utcnow() + datetime.timedelta(seconds=delay),
+            "error": error,
+        }
+        if not count_attempt:
+            values["attempts"] = JobItem.attempts - 1
+        db.query(JobItem).filter(JobItem.id == item_id).update(values, synchronize_session=False)
+        db.commit()
+
+    def fail_item(self, db: Session, *, item_id: int, error: str) -> None:
+        db.query(JobItem).filter(JobItem.id == item_id).update(
+            {"status": JobItemStatus.FAILED, "error": error},
+            synchronize_session=False,
+        )
+        db.commit()
+
+
+crud_job = CRUDJob(Job)
@@ -0,0 +1,238 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import datetime
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, undefer_group
+
+from app.core.hashing import prompt_hash
+from app.crud.base import AsyncCRUDBase, CRUDBase
+from app.db.models.output import LLM_OUTPUT, Output
+from app.db.models.prompt import Prompt
+from app.db.models.video import Video
+from app.schemas.prompt import OutputCreate, OutputUpdate
+
+
+class CRUDOutput(CRUDBase[Output, OutputCreate, OutputUpdate]):
+    def get_cached(
+        self,
+        db: Session,
+        *,
+        youtube_id: str,
+        model: str,
+        prompt_id: Optional[str] = None,
+        prompt_text: Optional[str] = None,
+        with_content: bool = True
+    ) -> Optional[Output]:
+        """
+        Resolve youtube_id + prompt (by ID or by text) to a stored output in one query.
+
+        Served by the unique (prompt_id, video_id, model) index together with
+        the unique indexes on videos.youtube_id and prompts.content_hash.
+        Pass with_content=False when only the row's keys are needed, to skip
+        reading and decoding llm_output.
+        """
+        query = (
+            db.query(Output)
+            .join(Video, Output.video_id == Video.id)
+            .filter(Video.youtube_id == youtube_id, Output.model == model)
+        )
+        if with_content:
+            query = query.options(undefer_group(LLM_OUTPUT))
+        if prompt_id:
+            query = query.filter(Output.prompt_id == prompt_id)
+        else:
+            query = query.join(Prompt, Output.prompt_id == Prompt.id).filter(
+                Prompt.content_hash == prompt_hash(prompt_text)
+            )
+        return query.first()
+
+    def get_multi_for_prompt(
+        self, db: Session, *, prompt_id: str, video_ids: List[int], model: str
+    ) -> List[Output]:
+        if not video_ids:
+            return []
+        return (
+            db.query(Output)
+            .options(undefer_group(LLM_OUTPUT))
+            .filter(
+                Output.prompt_id == prompt_id,
+                Output.video_id.in_(video_ids),
+                Output.model == model,
+            )
+            .all()
+        )
+
+    def get_summaries(
+        self, db: Session, *, prompt_ids: List[str]
+    ) -> Dict[str, Tuple[int, Optional[datetime.datetime]]]:
+        """
+        Output count and latest run date per prompt, in one grouped query.
+        """
+        if not prompt_ids:
+            return {}
+        return _summaries(db.execute(_summaries_statement(prompt_ids)).all())
+
+    def get_latest_for_prompts(
+        self, db: Session, *, prompt_ids: List[str], limit: int
+    ) -> Dict[str, List[Output]]:
+        """
+        The `limit` most recent outputs of each prompt, in one query.
+
+        Ranks outputs per prompt with ROW_NUMBER() so prompts with thousands of
+        outputs still contribute only `limit` rows.
+        """
+        if not prompt_ids:
+            return {}
+        return _by_prompt(db.scalars(_latest_statement(prompt_ids, limit)))
+
+    def get_usage_stats(
+        self,
+        db: Session,
+        *,
+        group_by: str,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        model: Optional[str] = None,
+        prompt_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Token totals and p50/p95 time_to_generate per prompt, model or day.
+
+        Date filters use ix_outputs_run_date (or ix_outputs_model_run_date when
+        filtering by model). Percentiles are computed in the database on
+        Postgres and in Python on other backends.
+        """
+        key = {
+            "prompt": Output.prompt_id,
+            "model": Output.model,
+            "day": func.date(Output.run_date),
+        }[group_by].label("key")
+
+        filters = []
+        if start is not None:
+            filters.append(Output.run_date >= start)
+        if end is not None:
+            filters.append(Output.run_date < end)
+        if model is not None:
+            filters.append(Output.model == model)
+        if prompt_id is not None:
+            filters.append(Output.prompt_id == prompt_id)
+
+        columns = [
+            key,
+            func.count(Output.id).label("runs"),
+            func.count(Output.total_tokens).label("runs_with_usage"),
+        ] + [
+            func.coalesce(func.sum(column), 0).label(column.key)
+            for column in (
+                Output.prompt_tokens, Output.video_tokens, Output.audio_tokens,
+                Output.output_tokens, Output.cached_tokens, Output.total_tokens,
+            )
+        ]
+        in_database = db.get_bind().dialect.name == "postgresql"
+        if in_database:
+            columns += [
+                func.percentile_cont(0.5).within_group(Output.time_to_generate).label("p50_time_to_generate"),
+                func.percentile_cont(0.95).within_group(Output.time_to_generate).label("p95_time_to_generate"),
+            ]
+        rows = [
+            dict(row._mapping)
+            for row in db.query(*columns).filter(*filters).group_by(key).order_by(key).all()
+        ]
+
+        if not in_database:
+            times: Dict[Any, List[float]] = {}
+            for group, time_to_generate in (
+                db.query(key, Output.time_to_generate)
+                .filter(*filters)
+                .order_by(key, Output.time_to_generate)
+            ):
+                times.setdefault(group, []).append(time_to_generate)
+            for row in rows:
+                values = times.get(row["key"], [])
+                row["p50_time_to_generate"] = _percentile(values, 0.5)
+                row["p95_time_to_generate"] = _percentile(values, 0.95)
+
+        for row in rows:
+            row["key"] = str(row["key"])
+        return rows
+
+
+class AsyncCRUDOutput(AsyncCRUDBase[Output, OutputCreate, OutputUpdate]):
+    async def get_summaries(
+        self, db: AsyncSession, *, prompt_ids: List[str]
+    ) -> Dict[str, Tuple[int, Optional[datetime.datetime]]]:
+        """
+        Async CRUDOutput.get_summaries.
+        """
+        if not prompt_ids:
+            return {}
+        result = await db.execute(_summaries_statement(prompt_ids))
+        return _summaries(result.all())
+
+    async def get_latest_for_prompts(
+        self, db: AsyncSession, *, prompt_ids: List[str], limit: int
+    ) -> Dict[str, List[Output]]:
+        """
+        Async CRUDOutput.get_latest_for_prompts.
+        """
+        if not prompt_ids:
+            return {}
+        return _by_prompt(await db.scalars(_latest_statement(prompt_ids, limit)))
+
+
+def _summaries_statement(prompt_ids: List[str]) -> Select:
+    return (
+        select(Output.prompt_id, func.count(Output.id), func.max(Output.run_date))
+        .where(Output.prompt_id.in_(prompt_ids))
+        .group_by(Output.prompt_id)
+    )
+
+
+def _summaries(rows: Iterable[Any]) -> Dict[str, Tuple[int, Optional[datetime.datetime]]]:
+    return {prompt_id: (count, last_run_date) for prompt_id, count, last_run_date in rows}
+
+
+def _latest_statement(prompt_ids: List[str], limit: int) -> Select:
+    ranked = (
+        select(
+            Output,
+            func.row_number().over(
+                partition_by=Output.prompt_id,
+                order_by=(Output.run_date.desc(), Output.id.desc()),
+            ).label("rank"),
+        )
+        .where(Output.prompt_id.in_(prompt_ids))
+        .subquery()
+    )
+    latest = aliased(Output, ranked)
+    return (
+        select(latest)
+        .options(undefer_group(LLM_OUTPUT))
+        .where(ranked.c.rank <= limit)
+        .order_by(ranked.c.prompt_id, ranked.c.rank)
+    )
+
+
+def _by_prompt(outputs: Iterable[Output]) -> Dict[str, List[Output]]:
+    grouped: Dict[str, List[Output]] = {}
+    for output in outputs:
+        grouped.setdefault(output.prompt_id, []).append(output)
+    return grouped
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    """
+    Linear-interpolated percentile of sorted values, matching percentile_cont.
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+crud_output = CRUDOutput(Output)
+async_crud_output = AsyncCRUDOutput(Output)
@@ -1,13 +1,69 @@
-from typing import List
+from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.crud.base import CRUDBase
+from app.core.hashing import prompt_hash
+from app.crud.base import AsyncCRUDBase, CRUDBase
+from app.db.models.output import LLM_OUTPUT
 from app.db.models.prompt import Prompt
 from app.schemas.prompt import PromptCreate, PromptUpdate
 
 
 class CRUDPrompt(CRUDBase[Prompt, PromptCreate, PromptUpdate]):
+    def get_with_outputs(self, db: Session, id: str) -> Optional[Prompt]:
+        """
+        Get a prompt with all its outputs and their content in two queries.
+        """
+        return db.query(Prompt).options(_WITH_OUTPUTS).filter(Prompt.id == id).first()
+
+    def get_by_content(
+        self, db: Session, *, user_prompt: str, system_prompt: Optional[str] = None
+    ) -> Optional[Prompt]:
+        return (
+            db.query(Prompt)
+            .filter(Prompt.content_hash == prompt_hash(user_prompt, system_prompt))
+            .first()
+        )
+
+    def get_or_create_by_content(
+        self,
+        db: Session,
+        *,
+        id: str,
+        user_prompt: str,
+        system_prompt: Optional[str] = None,
+        user_id: int
+    ) -> Prompt:
+        """
+        Get the prompt with this content, creating it with the given ID if missing.
+
+        Flushes but does not commit. Safe against a concurrent insert of the
+        same content: the loser of the unique-index race returns the winner's row.
+        """
+        prompt = self.get_by_content(
+            db, user_prompt=user_prompt, system_prompt=system_prompt
+        )
+        if prompt:
+            return prompt
+
+        prompt = Prompt(
+            id=id,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            user_id=user_id,
+        )
+        try:
+            with db.begin_nested():
+                db.add(prompt)
+        except IntegrityError:
+            prompt = self.get_by_content(
+                db, user_prompt=user_prompt, system_prompt=system_prompt
+            )
+        return prompt
+
     def get_multi_by_video(
         self, db: Session, *, video_id: int, skip: int = 0, limit: int = 100
     ) -> List[Prompt]:
@@ -20,4 +76,59 @@ class CRUDPrompt(CRUDBase[Prompt, PromptCreate, PromptUpdate]):
         )
 
 
-crud_prompt = CRUDPrompt(Prompt) 
\ No newline at end of file
+class AsyncCRUDPrompt(AsyncCRUDBase[Prompt, PromptCreate, PromptUpdate]):
+    async def get_with_outputs(self, db: AsyncSession, id: str) -> Optional[Prompt]:
+        """
+        Async CRUDPrompt.get_with_outputs: the prompt, its outputs and their content.
+        """
+        result = await db.execute(select(Prompt).options(_WITH_OUTPUTS).where(Prompt.id == id))
+        return result.scalars().first()
+
+    async def get_by_content(
+        self, db: AsyncSession, *, user_prompt: str, system_prompt: Optional[str] = None
+    ) -> Optional[Prompt]:
+        result = await db.execute(
+            select(Prompt).where(Prompt.content_hash == prompt_hash(user_prompt, system_prompt))
+        )
+        return result.scalars().first()
+
+    async def get_or_create_by_content(
+        self,
+        db: AsyncSession,
+        *,
+        id: str,
+        user_prompt: str,
+        system_prompt: Optional[str] = None,
+        user_id: int
+    ) -> Prompt:
+        """
+        Async CRUDPrompt.get_or_create_by_content: flushes but does not commit.
+        """
+        prompt = await self.get_by_content(
+            db, user_prompt=user_prompt, system_prompt=system_prompt
+        )
+        if prompt:
+            return prompt
+
+        prompt = Prompt(
+            id=id,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            user_id=user_id,
+        )
+        try:
+            async with db.begin_nested():
+                db.add(prompt)
+        except IntegrityError:
+            prompt = await self.get_by_content(
+                db, user_prompt=user_prompt, system_prompt=system_prompt
+            )
+        return prompt
+
+
+# Loads every output with its llm_output in one extra query
+_WITH_OUTPUTS = selectinload(Prompt.outputs).undefer_group(LLM_OUTPUT)
+
+
+crud_prompt = CRUDPrompt(Prompt)
+async_crud_prompt = AsyncCRUDPrompt(Prompt)
@@ -1,8 +1,10 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, load_only, undefer
 
-from app.crud.base import CRUDBase
+from app.crud.base import AsyncCRUDBase, CRUDBase
 from app.db.models.video import Video
 from app.schemas.video import VideoCreate, VideoUpdate
 
@@ -11,6 +13,72 @@ class CRUDVideo(CRUDBase[Video, VideoCreate, VideoUpdate]):
     def get_by_youtube_id(self, db: Session, *, youtube_id: str) -> Optional[Video]:
         return db.query(Video).filter(Video.youtube_id == youtube_id).first()
 
+    def get_multi_by_youtube_ids(
+        self, db: Session, *, youtube_ids: List[str], details: bool = False
+    ) -> List[Video]:
+        """
+        Args:
+            details: Also load the deferred description and video_metadata
+                columns, for callers that serialize whole videos
+        """
+        if not youtube_ids:
+            return []
+        query = db.query(Video).filter(Video.youtube_id.in_(youtube_ids))
+        if details:
+            query = query.options(*_DETAILS)
+        return query.all()
+
+    def query_fields(self, db: Session, *, fields: Sequence[str]) -> Query:
+        """
+        Query videos selecting only the named columns.
+
+        id and created_at are always selected since pagination keys on them.
+        """
+        return db.query(Video).options(_only_fields(fields))
+
+    def get_or_create_from_metadata(
+        self, db: Session, *, youtube_id: str, video_metadata: Dict[str, Any], user_id: int
+    ) -> Video:
+        """
+        Insert a video with INSERT ... ON CONFLICT (youtube_id) DO NOTHING and
+        return the stored row, whether this call or a concurrent one created it.
+
+        Never raises IntegrityError on a duplicate youtube_id. The caller commits.
+        """
+        statement = self._insert_on_conflict(db).values(
+            **_metadata_row(youtube_id, video_metadata, user_id)
+        ).on_conflict_do_nothing(index_elements=["youtube_id"])
+        db.execute(statement)
+        return self.get_by_youtube_id(db, youtube_id=youtube_id)
+
+    def create_many_from_metadata(
+        self, db: Session, *, metadata_by_id: Dict[str, Dict[str, Any]], user_id: int
+    ) -> Dict[str, Video]:
+        """
+        Create videos from fetched metadata with chunked INSERT ... ON CONFLICT
+        DO NOTHING statements and one commit.
+
+        Videos that already exist, or are created concurrently, are returned
+        as they are rather than duplicated.
+
+        Returns:
+            Dict mapping youtube_id to video
+        """
+        self.upsert_many(
+            db,
+            objs_in=[
+                _metadata_row(youtube_id, video_metadata, user_id)
+                for youtube_id, video_metadata in metadata_by_id.items()
+            ],
+            index_elements=["youtube_id"],
+            update_fields=[]
+        )
+        # Load everything in one query, whether it was inserted now or before
+        return {
+            video.youtube_id: video
+            for video in self.get_multi_by_youtube_ids(db, youtube_ids=list(metadata_by_id))
+        }
+
     def get_multi_by_user(
         self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100
     ) -> List[Video]:
@@ -23,4 +91,47 @@ class CRUDVideo(CRUDBase[Video, VideoCreate, VideoUpdate]):
         )
 
 
-crud_video = CRUDVideo(Video) 
\ No newline at end of file
+def _metadata_row(youtube_id: str, video_metadata: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    return {
+        "youtube_id": youtube_id,
+        "title": video_metadata["title"],
+        "description": video_metadata.get("description", ""),
+        "video_metadata": video_metadata,
+        "user_id": user_id,
+    }
+
+
+# Loads the deferred columns along with the row
+_DETAILS = (undefer(Video.description), undefer(Video.video_metadata))
+
+
+def _only_fields(fields: Sequence[str]):
+    columns = dict.fromkeys(["id", "created_at", *fields])
+    return load_only(*(getattr(Video, name) for name in columns))
+
+
+class AsyncCRUDVideo(AsyncCRUDBase[Video, VideoCreate, VideoUpdate]):
+    async def get_by_youtube_id(self, db: AsyncSession, *, youtube_id: str) -> Optional[Video]:
+        result = await db.execute(select(Video).where(Video.youtube_id == youtube_id))
+        return result.scalars().first()
+
+    async def get_multi_by_youtube_ids(
+        self, db: AsyncSession, *, youtube_ids: List[str], details: bool = False
+    ) -> List[Video]:
+        if not youtube_ids:
+            return []
+        statement = select(Video).where(Video.youtube_id.in_(youtube_ids))
+        if details:
+            statement = statement.options(*_DETAILS)
+        result = await db.execute(statement)
+        return list(result.scalars().all())
+
+    def select_fields(self, *, fields: Sequence[str]) -> Select:
+        """
+        Select videos with only the named columns loaded; see CRUDVideo.query_fields.
+        """
+        return select(Video).options(_only_fields(fields))
+
+
+crud_video = CRUDVideo(Video)
+async_crud_video = AsyncCRUDVideo(Video) 
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Async engine and sessions, for endpoints that await the database directly
+instead of running sync sessions in the threadpool.
+
+The engine is created on first use, so processes that only use the sync
+engine in app.db.database (scripts, Alembic, the worker) never load the
+async drivers. Both engines share the DB_POOL_* settings.
+"""
+from typing import Any, Dict, Mapping, Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from app.core.config import settings
+from app.core.metrics import track_queries
+from app.core.profiling import trace_queries
+from app.db.database import engine_options
+from app.db.pool import ASYNC_POOL_CLASSES, instrument
+import logging
+import threading
+
+# Async driver used for each backend when ASYNC_DATABASE_URI is not set
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+# libpq query args that asyncpg reads under another name, and the ones it
+# understands as they are; anything else in a psycopg URL is dropped
+ASYNCPG_RENAMED_ARGS = {"sslmode": "ssl"}
+ASYNCPG_ARGS = {"ssl", "prepared_statement_cache_size"}
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()  # get_async_sessionmaker builds the engine while holding it
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+
+def async_database_uri() -> str:
+    """
+    Raises:
+        ValueError: If there is no async driver for the configured database
+    """
+    if settings.ASYNC_DATABASE_URI:
+        return settings.ASYNC_DATABASE_URI
+    url = make_url(settings.SQLALCHEMY_DATABASE_URI)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {backend}; set ASYNC_DATABASE_URI")
+    if backend == "postgresql":
+        url = url.set(query=_asyncpg_query(url.query))
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def _asyncpg_query(query: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Translate the query args of a libpq URL to the connect args of asyncpg,
+    which rejects the ones it does not know.
+    """
+    translated = {}
+    for name, value in query.items():
+        name = ASYNCPG_RENAMED_ARGS.get(name, name)
+        if name in ASYNCPG_ARGS:
+            translated[name] = value
+        else:
+            logger.warning(f"Ignoring database URL argument {name} for asyncpg; set ASYNC_DATABASE_URI to pass it")
+    return translated
+
+def get_async_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                engine = create_async_engine(async_database_uri(), **engine_options(ASYNC_POOL_CLASSES))
+                instrument(engine.sync_engine)
+                track_queries(engine.sync_engine)
+                trace_queries(engine.sync_engine)
+                _engine = engine
+    return _engine
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    global _sessionmaker
+    if _sessionmaker is None:
+        with _lock:
+            if _sessionmaker is None:
+                # Objects stay usable after commit; an expired attribute cannot lazy-load under asyncio
+                _sessionmaker = async_sessionmaker(
+                    bind=get_async_engine(), class_=AsyncSession, autoflush=False, expire_on_commit=False
+                )
+    return _sessionmaker
+
+async def dispose_async_engine() -> None:
+    """
+    Close the async engine's pooled connections, if it was ever created.
+
+    aiosqlite runs each connection on its own non-daemon thread, so a
+    process exits only once they are closed.
+    """
+    global _engine, _sessionmaker
+    with _lock:
+        engine, _engine, _sessionmaker = _engine, None, None
+    if engine is not None:
+        await engine.dispose()
@@ -1,9 +1,34 @@
+from typing import Any, Dict, Type
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import Pool
 from app.core.config import settings
+from app.core.metrics import track_queries
+from app.core.profiling import trace_queries
+from app.db.pool import POOL_CLASSES, instrument
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+def engine_options(pool_classes: Dict[str, Type[Pool]] = POOL_CLASSES) -> Dict[str, Any]:
+    """
+    create_engine() pool arguments from DB_POOL_* settings.
+    """
+    options: Dict[str, Any] = {
+        "poolclass": pool_classes[settings.DB_POOL_CLASS],
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_POOL_CLASS == "queue":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return options
+
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, **engine_options())
+instrument(engine)
+track_queries(engine)
+trace_queries(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -14,4 +39,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
@@ -1,3 +1,7 @@
 from app.db.models.user import User
 from app.db.models.video import Video
-from app.db.models.prompt import Prompt 
\ No newline at end of file
+from app.db.models.prompt import Prompt
+from app.db.models.output import Output
+from app.db.models.run_claim import RunClaim
+from app.db.models.job import Job, JobItem
+from app.db.models.api_quota_usage import ApiQuotaUsage
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, Integer, Date
+from app.db.base_class import Base
+
+class ApiQuotaUsage(Base):
+    __tablename__ = "api_quota_usage"
+
+    api = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)  # Quota day in the API's reset timezone
+    units = Column(Integer, nullable=False, default=0)
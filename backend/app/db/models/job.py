@@ -0,0 +1,45 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base_class import Base
+
+class JobItemStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    total_items = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    items = relationship("JobItem", back_populates="job", cascade="all, delete-orphan")
+
+class JobItem(Base):
+    __tablename__ = "job_items"
+    __table_args__ = (
+        # Progress counts per job
+        Index("ix_job_items_job_id_status", "job_id", "status"),
+        # Workers claim pending items that are due and running items whose lease expired
+        Index("ix_job_items_status_run_after", "status", "run_after"),
+        Index("ix_job_items_status_claimed_at", "status", "claimed_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, ForeignKey("jobs.id"), nullable=False)
+    prompt_id = Column(String, ForeignKey("prompts.id"), nullable=False)
+    video_url = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=JobItemStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime, nullable=True)  # Earliest claim time while pending (retry backoff)
+    claimed_at = Column(DateTime, nullable=True)  # Lease start while running
+    output_id = Column(String, ForeignKey("outputs.id"), nullable=True)
+    error = Column(String, nullable=True)
+
+    # Relationships
+    job = relationship("Job", back_populates="items")
@@ -1,18 +1,68 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Float
-from sqlalchemy.orm import relationship
+from typing import Any
+from sqlalchemy import CheckConstraint, Column, String, Integer, ForeignKey, DateTime, Float, Index, JSON, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
+from app.core.config import settings
 from app.db.base_class import Base
 import datetime
+import json
+import zlib
+
+# Deferred group of the llm_output columns; undefer_group(LLM_OUTPUT) loads the document
+LLM_OUTPUT = "llm_output"
 
 class Output(Base):
     __tablename__ = "outputs"
+    __table_args__ = (
+        # Cache probe: one output per (prompt, video, model)
+        Index("ix_outputs_prompt_id_video_id_model", "prompt_id", "video_id", "model", unique=True),
+        # Usage aggregates by day and by model
+        Index("ix_outputs_run_date", "run_date"),
+        Index("ix_outputs_model_run_date", "model", "run_date"),
+        # The document is stored in exactly one of the two llm_output columns
+        CheckConstraint(
+            "(llm_output IS NULL) <> (llm_output_zlib IS NULL)", name="ck_outputs_llm_output_one_column"
+        ),
+    )
 
     id = Column(String, primary_key=True, index=True)
-    video_id = Column(Integer, ForeignKey("videos.id"), nullable=False)
+    video_id = Column(Integer, ForeignKey("videos.id"), nullable=False, index=True)
     prompt_id = Column(String, ForeignKey("prompts.id"), nullable=False)
-    llm_output = Column(String, nullable=False)
+    model = Column(String, nullable=False)  # Model requested; part of the cache key
+    model_version = Column(String, nullable=True)  # Model version Gemini reports having served
+    # Read and written through the llm_output property. Documents up to
+    # LLM_OUTPUT_COMPRESS_THRESHOLD bytes are stored as JSON (JSONB on Postgres),
+    # larger ones zlib-compressed, which is about 30% smaller than leaving them
+    # to TOAST. Only read when accessed, or when a query undefers LLM_OUTPUT
+    _llm_output = deferred(Column(
+        "llm_output", JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+    ), group=LLM_OUTPUT)
+    llm_output_zlib = deferred(Column(LargeBinary), group=LLM_OUTPUT)
     run_date = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
     time_to_generate = Column(Float, nullable=False)  # Time in seconds
 
+    # Token counts from Gemini usage_metadata; null for outputs stored before they were recorded
+    prompt_tokens = Column(Integer, nullable=True)
+    video_tokens = Column(Integer, nullable=True)  # Part of prompt_tokens
+    audio_tokens = Column(Integer, nullable=True)  # Part of prompt_tokens
+    output_tokens = Column(Integer, nullable=True)
+    cached_tokens = Column(Integer, nullable=True)  # Part of prompt_tokens served from context cache
+    total_tokens = Column(Integer, nullable=True)
+
     # Relationships
     video = relationship("Video", back_populates="outputs")
-    prompt = relationship("Prompt", back_populates="outputs") 
\ No newline at end of file
+    prompt = relationship("Prompt", back_populates="outputs")
+
+    @property
+    def llm_output(self) -> Any:
+        if self.llm_output_zlib is not None:
+            return json.loads(zlib.decompress(self.llm_output_zlib))
+        return self._llm_output
+
+    @llm_output.setter
+    def llm_output(self, value: Any) -> None:
+        raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        if len(raw) > settings.LLM_OUTPUT_COMPRESS_THRESHOLD:
+            self._llm_output, self.llm_output_zlib = None, zlib.compress(raw)
+        else:
+            self._llm_output, self.llm_output_zlib = value, None
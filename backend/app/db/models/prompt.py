@@ -1,18 +1,33 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+from app.core.hashing import prompt_hash
 from app.db.base_class import Base
 
 class Prompt(Base):
     __tablename__ = "prompts"
+    __table_args__ = (
+        # Keyset pagination (CRUDBase.get_page)
+        Index("ix_prompts_created_at_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     system_prompt = Column(String, nullable=True)
     user_prompt = Column(String, nullable=False)
+    # prompt_hash() of the prompt content; kept in sync by _sync_content_hash
+    content_hash = Column(String(64), unique=True, index=True, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     user = relationship("User", back_populates="prompts")
-    outputs = relationship("Output", back_populates="prompt") 
\ No newline at end of file
+    outputs = relationship("Output", back_populates="prompt")
+
+    @validates("user_prompt", "system_prompt")
+    def _sync_content_hash(self, key, value):
+        user_prompt = value if key == "user_prompt" else self.user_prompt
+        system_prompt = value if key == "system_prompt" else self.system_prompt
+        if user_prompt is not None:
+            self.content_hash = prompt_hash(user_prompt, system_prompt)
+        return value
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, DateTime
+from app.db.base_class import Base
+import datetime
+
+class RunClaim(Base):
+    __tablename__ = "run_claims"
+
+    # run_key() of the (video, prompt, model) being generated
+    key = Column(String(64), primary_key=True)
+    claimed_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
@@ -1,16 +1,21 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.db.base_class import Base
 
 class Video(Base):
     __tablename__ = "videos"
+    __table_args__ = (
+        # Keyset pagination (CRUDBase.get_page)
+        Index("ix_videos_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     youtube_id = Column(String, unique=True, index=True, nullable=False)
     title = Column(String)
-    description = Column(String)
-    video_metadata = Column(JSON)
+    # Large columns, loaded on first access unless a query undefers them
+    description = deferred(Column(String))
+    video_metadata = deferred(Column(JSON))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
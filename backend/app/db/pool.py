@@ -0,0 +1,133 @@
+"""
+Connection pool selection and instrumentation.
+
+The engines' pool class is chosen from settings (DB_POOL_CLASS) and wrapped
+so that time spent waiting for a connection and the number of connections
+in use are recorded in `pool_stats`, which covers every engine in the
+process (sync and async).
+"""
+from typing import Any, Dict, Type
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+from app.core import metrics
+import threading
+import time
+
+class PoolStats:
+    """
+    Thread-safe counters and gauges for one engine's connection pool.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.in_use = 0
+        self.in_use_max = 0
+
+    def record_wait(self, seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.checkout_wait_total += seconds
+            self.checkout_wait_max = max(self.checkout_wait_max, seconds)
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.in_use += 1
+            self.in_use_max = max(self.in_use_max, self.in_use)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_wait_seconds_total": round(self.checkout_wait_total, 6),
+                "checkout_wait_seconds_avg": round(self.checkout_wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "checkout_wait_seconds_max": round(self.checkout_wait_max, 6),
+                "checkout_timeouts": self.timeouts,
+                "connections_opened": self.connects,
+                "in_use": self.in_use,
+                "in_use_max": self.in_use_max,
+            }
+
+pool_stats = PoolStats()
+
+metrics.registry.collector(
+    "db_pool_connections_in_use", "Database connections checked out of the pool.", "gauge",
+    lambda: [({}, pool_stats.in_use)]
+)
+metrics.registry.collector(
+    "db_pool_checkout_wait_seconds_total", "Time spent waiting for a pooled connection.", "counter",
+    lambda: [({}, pool_stats.checkout_wait_total)]
+)
+metrics.registry.collector(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT.", "counter",
+    lambda: [({}, pool_stats.timeouts)]
+)
+
+class _TimedCheckout:
+    """
+    Mixin timing _do_get, which is where a checkout waits for a free
+    connection (QueuePool) or opens a new one (NullPool).
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start, timed_out=False)
+        return connection
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    pass
+
+POOL_CLASSES: Dict[str, Type[Pool]] = {
+    "queue": TimedQueuePool,  # Long-running servers and workers
+    "null": TimedNullPool,  # Serverless: no connections kept between invocations
+}
+
+# Same choices for the async engine, whose queue pool must be asyncio-aware
+ASYNC_POOL_CLASSES: Dict[str, Type[Pool]] = {
+    "queue": TimedAsyncQueuePool,
+    "null": TimedNullPool,
+}
+
+def instrument(engine: Engine) -> None:
+    """
+    Track connections opened and in use for `engine`.
+    """
+    event.listen(engine, "connect", lambda dbapi_connection, record: pool_stats.record_connect())
+    event.listen(engine, "checkout", lambda dbapi_connection, record, proxy: pool_stats.record_checkout())
+    event.listen(engine, "checkin", lambda dbapi_connection, record: pool_stats.record_checkin())
+
+def snapshot(engine: Engine) -> Dict[str, Any]:
+    pool = engine.pool
+    state = {"pool_class": type(pool).__name__, **pool_stats.snapshot()}
+    if isinstance(pool, QueuePool):
+        state.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    return state
@@ -1,12 +1,22 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.v1.router import api_router
+from app.core import metrics, profiling
 from app.core.config import settings
+from app.db.async_database import dispose_async_engine
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await dispose_async_engine()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="API for analyzing YouTube videos with LLMs",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -16,11 +26,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Id"],
 )
 
+# Request latency and per-request DB work, served by /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Sampling profile and SQL trace for requests sent with an X-Profile header
+app.add_middleware(profiling.ProfilingMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api")
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to YouTube LabelBase API"} 
\ No newline at end of file
+    return {"message": "Welcome to YouTube LabelBase API"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics() -> PlainTextResponse:
+    """
+    This process's metrics in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import datetime
+
+class JobCreate(BaseModel):
+    videoUrls: List[str] = Field(..., min_length=1)
+    prompts: List[str] = []
+    promptIds: List[str] = []
+
+class JobProgress(BaseModel):
+    id: str
+    status: str
+    created_at: datetime
+    total_items: int
+    pending: int = 0
+    running: int = 0
+    done: int = 0
+    failed: int = 0
@@ -1,16 +1,32 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import BaseModel
 from datetime import datetime
 
 class OutputBase(BaseModel):
-    llm_output: str
+    llm_output: Dict[str, Any]
     run_date: datetime
     time_to_generate: float
 
+class OutputCreate(OutputBase):
+    video_id: int
+    prompt_id: str
+    model: str
+
+class OutputUpdate(OutputBase):
+    pass
+
 class Output(OutputBase):
     id: str
     video_id: int
     prompt_id: str
+    model: str
+    model_version: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    video_tokens: Optional[int] = None
+    audio_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -35,6 +51,22 @@ class Prompt(PromptBase):
     class Config:
         from_attributes = True
 
+class PromptSummary(PromptBase):
+    """
+    Prompt listing entry. Outputs are only included when requested, and
+    then only the most recent few.
+    """
+    id: str
+    user_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    output_count: int = 0
+    last_run_date: Optional[datetime] = None
+    outputs: Optional[List[Output]] = None
+
+    class Config:
+        from_attributes = True
+
 # Schema for frontend request
 class RunPromptRequest(BaseModel):
     videoUrl: str
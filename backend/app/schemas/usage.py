@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class UsageStats(BaseModel):
+    key: str  # Prompt ID, model or day, depending on group_by
+    runs: int
+    runs_with_usage: int  # Runs that recorded token counts
+    prompt_tokens: int = 0
+    video_tokens: int = 0
+    audio_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    total_tokens: int = 0
+    estimated_cost_usd: float = 0.0
+    p50_time_to_generate: Optional[float] = None
+    p95_time_to_generate: Optional[float] = None
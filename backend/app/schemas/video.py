@@ -1,5 +1,5 @@
-from pydantic import BaseModel, HttpUrl
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 class VideoBase(BaseModel):
@@ -23,4 +23,28 @@ class VideoInDBBase(VideoBase):
         from_attributes = True
 
 class Video(VideoInDBBase):
-    pass 
\ No newline at end of file
+    pass
+
+# Columns that can be requested with ?fields= on the videos endpoints
+VIDEO_FIELDS = ("id", "youtube_id", "title", "description", "video_metadata", "created_at", "user_id")
+# Listings leave out the large description and video_metadata unless asked for
+VIDEO_LIST_FIELDS = ("id", "youtube_id", "title", "created_at", "user_id")
+
+class VideoFields(BaseModel):
+    """
+    Sparse video; serialize with exclude_unset so only requested fields appear.
+    """
+    id: Optional[int] = None
+    youtube_id: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    video_metadata: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+    user_id: Optional[int] = None
+
+class VideoBulkCreate(BaseModel):
+    urls: List[str] = Field(..., min_length=1)
+
+class VideoBulkResult(BaseModel):
+    videos: List[Video]
+    errors: Dict[str, str] = {}  # URL -> reason it was not imported
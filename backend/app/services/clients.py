@@ -0,0 +1,65 @@
+"""
+Process-wide API clients, built once and shared.
+
+The Gemini client owns pooled httpx connections (sync and async) that are
+safe to share across threads and tasks. The YouTube client is built once per
+API key from the discovery document bundled with google-api-python-client;
+because httplib2 connections are not thread-safe, each thread executes
+requests over its own keep-alive connection from youtube_http().
+
+The SDKs are imported on first use rather than at module load: together
+they dominate import time, and most requests (listings, cache hits) never
+call either API, which matters for serverless cold starts.
+"""
+from typing import TYPE_CHECKING, Dict
+from app.core.config import settings
+import threading
+
+if TYPE_CHECKING:
+    from google import genai
+    from googleapiclient.discovery import Resource
+    import httplib2
+
+_lock = threading.Lock()
+_genai_clients: Dict[str, "genai.Client"] = {}
+_youtube_clients: Dict[str, "Resource"] = {}
+_local = threading.local()
+
+def get_genai_client(api_key: str = None) -> "genai.Client":
+    api_key = api_key or settings.GEMINI_API_KEY
+    client = _genai_clients.get(api_key)
+    if client is None:
+        with _lock:
+            client = _genai_clients.get(api_key)
+            if client is None:
+                from google import genai
+                client = genai.Client(api_key=api_key)
+                _genai_clients[api_key] = client
+    return client
+
+def get_youtube_client(api_key: str) -> "Resource":
+    client = _youtube_clients.get(api_key)
+    if client is None:
+        with _lock:
+            client = _youtube_clients.get(api_key)
+            if client is None:
+                from googleapiclient.discovery import build
+                client = build(
+                    'youtube', 'v3',
+                    developerKey=api_key,
+                    static_discovery=True,
+                    cache_discovery=False
+                )
+                _youtube_clients[api_key] = client
+    return client
+
+def youtube_http() -> "httplib2.Http":
+    """
+    Keep-alive HTTP connection for YouTube requests made from the current thread.
+    """
+    http = getattr(_local, "youtube_http", None)
+    if http is None:
+        import httplib2
+        http = httplib2.Http(timeout=settings.YOUTUBE_HTTP_TIMEOUT)
+        _local.youtube_http = http
+    return http
@@ -1,7 +1,114 @@
+from app.core import metrics
 from app.core.config import settings
-from typing import Dict, Any
-from google import genai
-from google.genai import types
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, List, Optional
+from app.services import clients
+from app.services.rate_limiter import AdaptiveLimiter, SlotUsage, backoff_delay
+import asyncio
+import logging
+import time
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class LLMError(Exception):
+    pass
+
+def _status_code(e: BaseException) -> Optional[int]:
+    # google.genai.errors.APIError carries the HTTP status as `code`
+    return getattr(e, "code", None)
+
+def is_rate_limit_error(e: BaseException) -> bool:
+    return _status_code(e) == 429
+
+# Shared by every Gemini call in this process
+limiter = AdaptiveLimiter(
+    "gemini",
+    requests_per_minute=settings.GEMINI_RPM_LIMIT,
+    tokens_per_minute=settings.GEMINI_TPM_LIMIT,
+    initial_concurrency=settings.GEMINI_INITIAL_CONCURRENCY,
+    min_concurrency=settings.GEMINI_MIN_CONCURRENCY,
+    max_concurrency=settings.GEMINI_MAX_CONCURRENCY,
+    decrease_factor=settings.GEMINI_AIMD_DECREASE,
+    increase_step=settings.GEMINI_AIMD_INCREASE,
+    is_rate_limit_error=is_rate_limit_error
+)
+
+def _build_contents(video_url: str, prompt: str) -> "types.Content":
+    # Imported here so the SDK loads on the first Gemini call, not at startup
+    from google.genai import types
+    return types.Content(
+      parts=[
+        types.Part(
+          file_data=types.FileData(file_uri=video_url)
+        ),
+        types.Part(text=prompt)
+      ]
+    )
+
+def _record_usage(usage: SlotUsage, response: Any) -> None:
+    usage_metadata = getattr(response, "usage_metadata", None)
+    if usage_metadata is not None and usage_metadata.total_token_count is not None:
+      usage.tokens = usage_metadata.total_token_count
+
+def _retry_delay(e: Exception, attempt: int) -> Optional[float]:
+    """
+    Seconds to wait before retrying after `e`, or None if it should not be retried.
+    """
+    if _status_code(e) not in RETRYABLE_STATUS_CODES or attempt >= settings.GEMINI_MAX_RETRIES:
+      return None
+    return backoff_delay(attempt, settings.GEMINI_RETRY_BASE_DELAY, settings.GEMINI_RETRY_MAX_DELAY)
+
+def _modality_tokens(details: Any, modality: str) -> Optional[int]:
+    # prompt_tokens_details is a list of ModalityTokenCount(modality=..., token_count=...)
+    if not details:
+      return None
+    return sum(
+      d.token_count or 0 for d in details
+      if str(getattr(d.modality, "value", d.modality)).upper() == modality
+    )
+
+def format_usage(usage_metadata: Any) -> Dict[str, Optional[int]]:
+    """
+    Token counts reported by Gemini for one call; None where it reported nothing.
+    """
+    if usage_metadata is None:
+      return {
+        "prompt_tokens": None, "video_tokens": None, "audio_tokens": None,
+        "completion_tokens": None, "cached_tokens": None, "total_tokens": None
+      }
+    return {
+      "prompt_tokens": usage_metadata.prompt_token_count,
+      "video_tokens": _modality_tokens(usage_metadata.prompt_tokens_details, "VIDEO"),
+      "audio_tokens": _modality_tokens(usage_metadata.prompt_tokens_details, "AUDIO"),
+      "completion_tokens": usage_metadata.candidates_token_count,
+      "cached_tokens": usage_metadata.cached_content_token_count,
+      "total_tokens": usage_metadata.total_token_count
+    }
+
+def format_output(
+    text: str, usage_metadata: Any = None, model_version: Optional[str] = None
+) -> Dict[str, Any]:
+    return {
+      "content": text,
+      "model": model_version or settings.GEMINI_MODEL,
+      "usage": format_usage(usage_metadata)
+    }
+
+class StreamResult:
+    """
+    Collects a streamed response; read it once stream_prompt_async is exhausted.
+    """
+    def __init__(self):
+      self.chunks: List[str] = []
+      self.usage_metadata: Any = None
+      self.model_version: Optional[str] = None
+
+    def output(self) -> Dict[str, Any]:
+      return format_output("".join(self.chunks), self.usage_metadata, self.model_version)
 
 def run_prompt(
     video_url: str,
@@ -10,33 +117,92 @@ def run_prompt(
     """
     Run a prompt through the Gemini LLM.
     """
-    try:
-      client = genai.Client(api_key=settings.GEMINI_API_KEY)
-
-      response = client.models.generate_content(
-        model='models/gemini-2.0-flash',
-        contents=types.Content(
-          parts=[
-            types.Part(
-              file_data=types.FileData(file_uri=video_url)
-            ),
-            types.Part(text=prompt)
-          ]
-        )
-      )
-
-      # Extract token counts if available
-      prompt_tokens = len(prompt.split())  # Approximate token count
-      completion_tokens = len(response.text.split())  # Approximate token count
+    client = clients.get_genai_client()
+    attempt = 0
+    while True:
+      try:
+        with limiter.slot(settings.GEMINI_TOKENS_PER_CALL_ESTIMATE) as usage:
+          with metrics.external_call("gemini", "generate_content"):
+            response = client.models.generate_content(
+              model=f'models/{settings.GEMINI_MODEL}',
+              contents=_build_contents(video_url, prompt)
+            )
+          _record_usage(usage, response)
+        return format_output(response.text, response.usage_metadata, response.model_version)
+      except Exception as e:
+        delay = _retry_delay(e, attempt)
+        if delay is None:
+          raise LLMError(f"Error running prompt: {str(e)}") from e
+        logger.warning(f"Gemini call failed ({str(e)}), retrying in {delay:.1f}s")
+        attempt += 1
+        time.sleep(delay)
 
-      return {
-        "content": response.text,
-        "model": "gemini-pro",
-        "usage": {
-          "prompt_tokens": prompt_tokens,
-          "completion_tokens": completion_tokens,
-          "total_tokens": prompt_tokens + completion_tokens
-        }
-      }
-    except Exception as e:
-      raise Exception(f"Error running prompt: {str(e)}") 
\ No newline at end of file
+async def run_prompt_async(
+    video_url: str,
+    prompt: str
+) -> Dict[str, Any]:
+    """
+    Run a prompt through the Gemini LLM without blocking the event loop.
+    """
+    client = clients.get_genai_client()
+    attempt = 0
+    while True:
+      try:
+        async with limiter.slot_async(settings.GEMINI_TOKENS_PER_CALL_ESTIMATE) as usage:
+          with metrics.external_call("gemini", "generate_content"):
+            response = await client.aio.models.generate_content(
+              model=f'models/{settings.GEMINI_MODEL}',
+              contents=_build_contents(video_url, prompt)
+            )
+          _record_usage(usage, response)
+        return format_output(response.text, response.usage_metadata, response.model_version)
+      except Exception as e:
+        delay = _retry_delay(e, attempt)
+        if delay is None:
+          raise LLMError(f"Error running prompt: {str(e)}") from e
+        logger.warning(f"Gemini call failed ({str(e)}), retrying in {delay:.1f}s")
+        attempt += 1
+        await asyncio.sleep(delay)
+
+async def stream_prompt_async(
+    video_url: str,
+    prompt: str,
+    result: Optional[StreamResult] = None
+) -> AsyncIterator[str]:
+    """
+    Run a prompt through the Gemini LLM, yielding text chunks as they are generated.
+
+    Failures are retried only until the first chunk has been sent. If `result`
+    is given it collects the full text and the final usage_metadata.
+    """
+    client = clients.get_genai_client()
+    attempt = 0
+    started = False
+    while True:
+      try:
+        async with limiter.slot_async(settings.GEMINI_TOKENS_PER_CALL_ESTIMATE) as usage:
+          # Timed until the last chunk, including time the consumer takes between chunks
+          with metrics.external_call("gemini", "generate_content_stream"):
+            stream = await client.aio.models.generate_content_stream(
+              model=f'models/{settings.GEMINI_MODEL}',
+              contents=_build_contents(video_url, prompt)
+            )
+            async for chunk in stream:
+              _record_usage(usage, chunk)
+              if result is not None:
+                # Every chunk carries the running totals; the last one is final
+                result.usage_metadata = chunk.usage_metadata or result.usage_metadata
+                result.model_version = chunk.model_version or result.model_version
+              if chunk.text:
+                started = True
+                if result is not None:
+                  result.chunks.append(chunk.text)
+                yield chunk.text
+        return
+      except Exception as e:
+        delay = None if started else _retry_delay(e, attempt)
+        if delay is None:
+          raise LLMError(f"Error running prompt: {str(e)}") from e
+        logger.warning(f"Gemini stream failed ({str(e)}), retrying in {delay:.1f}s")
+        attempt += 1
+        await asyncio.sleep(delay)
@@ -0,0 +1,523 @@
+from typing import AsyncIterator, Dict, Any, List, NamedTuple, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core import metrics
+from app.core.config import settings
+from app.core.hashing import run_key, video_claim_key
+from app.crud import crud_output, crud_prompt, crud_video
+from app.db.database import SessionLocal
+from app.services import llm_service, single_flight, youtube_service
+from app.services.quota import QuotaExceededError, QuotaPriority
+from app.db.models.video import Video
+from app.db.models.prompt import Prompt
+from app.db.models.output import Output
+import asyncio
+import logging
+import uuid
+import time
+
+logger = logging.getLogger(__name__)
+
+# Identical runs in flight in this process, keyed on run_key()
+_in_flight = single_flight.SingleFlight()
+# New videos being fetched and stored in this process, keyed on video_claim_key()
+_new_videos = single_flight.SingleFlight()
+
+class PromptNotFoundError(LookupError):
+    pass
+
+class VideoNotStoredError(LookupError):
+    pass
+
+class PreparedRun(NamedTuple):
+    video_id: int
+    youtube_id: str
+    prompt_id: str
+    cached_output: Optional[Dict[str, Any]]
+
+class BatchPlan(NamedTuple):
+    prompt_id: str
+    prompt_text: str
+    # Result items that are already known (cached outputs and invalid URLs)
+    ready: List[Dict[str, Any]]
+    # (youtube_id, video_url, video_id) for known videos without an output
+    pending: List[Tuple[str, str, int]]
+    # (youtube_id, video_url) for videos not in the database yet
+    missing: List[Tuple[str, str]]
+
+def extract_youtube_id(video_url: str) -> str:
+    """
+    Raises:
+        ValueError: If the URL is not a recognised YouTube URL
+    """
+    try:
+        return youtube_service.extract_video_id(video_url)
+    except ValueError as e:
+        raise ValueError(f"Invalid YouTube URL: {str(e)}")
+
+def get_or_create_video(
+    db: Session, *, video_url: str, youtube_id: str, priority: str = QuotaPriority.INTERACTIVE
+) -> Video:
+    """
+    Get the video for a YouTube ID, fetching its metadata if it is new.
+
+    The row is inserted with ON CONFLICT (youtube_id) DO NOTHING, so a video
+    created concurrently by another process is returned instead of failing
+    the caller's transaction. Flushes but does not commit.
+
+    Raises:
+        ValueError: If metadata cannot be fetched
+        QuotaExceededError: If the YouTube quota for `priority` is exhausted
+    """
+    video = crud_video.get_by_youtube_id(db, youtube_id=youtube_id)
+    if video:
+        return video
+
+    try:
+        video_metadata = youtube_service.get_video_metadata(video_url, priority=priority)
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to fetch video metadata: {str(e)}")
+
+    return crud_video.get_or_create_from_metadata(
+        db,
+        youtube_id=youtube_id,
+        video_metadata=video_metadata,
+        user_id=1  # TODO: Get from authenticated user
+    )
+
+def _store_video(*, video_url: str, youtube_id: str, priority: str) -> None:
+    # Uses its own session because it outlives whichever request started it
+    db = SessionLocal()
+    try:
+        get_or_create_video(db, video_url=video_url, youtube_id=youtube_id, priority=priority)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def load_cached_output(
+    db: Session, *, youtube_id: str, prompt_text: str, prompt_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Load a cached output as a run result, or None if there is none yet.
+    """
+    existing_output = crud_output.get_cached(
+        db, youtube_id=youtube_id, model=settings.GEMINI_MODEL,
+        prompt_id=prompt_id, prompt_text=prompt_text
+    )
+    db.commit()
+    if not existing_output:
+        return None
+    return {"promptId": existing_output.prompt_id, "output": existing_output.llm_output}
+
+def get_or_create_prompt(
+    db: Session, *, prompt_text: str, prompt_id: Optional[str] = None
+) -> Prompt:
+    """
+    Get a prompt by ID, or get or create one by its normalized content.
+
+    Raises:
+        PromptNotFoundError: If prompt_id is given but does not exist
+    """
+    if prompt_id:
+        prompt = crud_prompt.get(db, id=prompt_id)
+        if not prompt:
+            raise PromptNotFoundError("Prompt not found")
+        return prompt
+
+    return crud_prompt.get_or_create_by_content(
+        db,
+        id=str(uuid.uuid4()),
+        system_prompt="",  # TODO: Add system prompt if needed
+        user_prompt=prompt_text,
+        user_id=1  # TODO: Get from authenticated user
+    )
+
+def prepare_run(
+    db: Session, *, video_url: str, prompt_text: str, prompt_id: Optional[str] = None,
+    priority: str = QuotaPriority.INTERACTIVE, create_video: bool = True
+) -> PreparedRun:
+    """
+    Look up a cached output, or resolve the video and prompt for a new run.
+
+    A cache hit costs a single indexed query. Commits before returning so no
+    connection is held while the LLM runs. YouTube API calls for a new video
+    are charged to the quota under `priority`.
+
+    Raises:
+        VideoNotStoredError: If create_video is False and the video is new
+    """
+    youtube_id = extract_youtube_id(video_url)
+    try:
+        existing_output = crud_output.get_cached(
+            db, youtube_id=youtube_id, model=settings.GEMINI_MODEL,
+            prompt_id=prompt_id, prompt_text=prompt_text
+        )
+        if existing_output:
+            metrics.output_cache_lookups.inc(result="hit")
+            result = PreparedRun(
+                existing_output.video_id, youtube_id, existing_output.prompt_id,
+                existing_output.llm_output
+            )
+        else:
+            if create_video:
+                video = get_or_create_video(
+                    db, video_url=video_url, youtube_id=youtube_id, priority=priority
+                )
+            else:
+                video = crud_video.get_by_youtube_id(db, youtube_id=youtube_id)
+                if video is None:
+                    raise VideoNotStoredError(youtube_id)
+            prompt = get_or_create_prompt(db, prompt_text=prompt_text, prompt_id=prompt_id)
+            result = PreparedRun(video.id, youtube_id, prompt.id, None)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+
+def save_output(
+    db: Session, *, video_id: int, prompt_id: str, output: Dict[str, Any], time_taken: float
+) -> Optional[Output]:
+    """
+    Persist an LLM output for a (video, prompt) pair.
+
+    Token counts from the output's usage block are stored in their own
+    columns so usage can be aggregated without parsing llm_output.
+
+    Returns None if an output for the pair and model was stored concurrently.
+    """
+    usage = output.get("usage") or {}
+    output_record = Output(
+        id=str(uuid.uuid4()),
+        video_id=video_id,
+        prompt_id=prompt_id,
+        model=settings.GEMINI_MODEL,
+        model_version=output.get("model"),
+        llm_output=output,
+        time_to_generate=time_taken,
+        prompt_tokens=usage.get("prompt_tokens"),
+        video_tokens=usage.get("video_tokens"),
+        audio_tokens=usage.get("audio_tokens"),
+        output_tokens=usage.get("completion_tokens"),
+        cached_tokens=usage.get("cached_tokens"),
+        total_tokens=usage.get("total_tokens")
+    )
+    db.add(output_record)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.warning(f"Output for video {video_id} with prompt {prompt_id} already exists")
+        return None
+    return output_record
+
+async def _generate(
+    key: str, *, video_url: str, prompt_text: str, prompt_id: Optional[str], prepared: PreparedRun
+) -> Dict[str, Any]:
+    """
+    Generate and store the output for one run key, unless another worker does.
+
+    Uses its own session because it outlives whichever request started it.
+    """
+    db = SessionLocal()
+    try:
+        while not await run_in_threadpool(single_flight.try_claim, db, key):
+            # Another worker is generating this output; wait for it to finish
+            await asyncio.sleep(settings.RUN_CLAIM_POLL_INTERVAL)
+            if await run_in_threadpool(single_flight.claim_is_live, db, key):
+                continue
+            cached = await run_in_threadpool(
+                load_cached_output, db, youtube_id=prepared.youtube_id,
+                prompt_text=prompt_text, prompt_id=prompt_id
+            )
+            if cached is not None:
+                metrics.output_cache_lookups.inc(result="coalesced")
+                return cached
+
+        try:
+            # The previous claim holder may have finished just before we claimed
+            cached = await run_in_threadpool(
+                load_cached_output, db, youtube_id=prepared.youtube_id,
+                prompt_text=prompt_text, prompt_id=prompt_id
+            )
+            if cached is not None:
+                metrics.output_cache_lookups.inc(result="coalesced")
+                return cached
+
+            # Run the prompt and measure time
+            metrics.output_cache_lookups.inc(result="miss")
+            start_time = time.time()
+            output = await llm_service.run_prompt_async(
+                video_url=video_url,
+                prompt=prompt_text
+            )
+            time_taken = time.time() - start_time
+
+            await run_in_threadpool(
+                save_output, db, video_id=prepared.video_id, prompt_id=prepared.prompt_id,
+                output=output, time_taken=time_taken
+            )
+            logger.info(
+                f"Generated output for video {prepared.video_id} with prompt {prepared.prompt_id} in {time_taken:.2f}s"
+            )
+        finally:
+            await run_in_threadpool(single_flight.release_claim, db, key)
+
+        return {"promptId": prepared.prompt_id, "output": output}
+    finally:
+        db.close()
+
+async def prepare_run_async(
+    db: Session, *, video_url: str, prompt_text: str, prompt_id: Optional[str] = None,
+    priority: str = QuotaPriority.INTERACTIVE
+) -> PreparedRun:
+    """
+    prepare_run for async callers.
+
+    Concurrent first requests for the same video in this process share one
+    metadata fetch and insert through SingleFlight. Across processes, the
+    ON CONFLICT insert in get_or_create_video settles the race. No thread
+    waits on another request.
+    """
+    try:
+        return await run_in_threadpool(
+            prepare_run, db, video_url=video_url, prompt_text=prompt_text, prompt_id=prompt_id,
+            priority=priority, create_video=False
+        )
+    except VideoNotStoredError:
+        pass
+
+    youtube_id = extract_youtube_id(video_url)
+    await _new_videos.do(video_claim_key(youtube_id), lambda: run_in_threadpool(
+        _store_video, video_url=video_url, youtube_id=youtube_id, priority=priority
+    ))
+    return await run_in_threadpool(
+        prepare_run, db, video_url=video_url, prompt_text=prompt_text, prompt_id=prompt_id,
+        priority=priority
+    )
+
+async def _generate_shared(
+    key: str, *, video_url: str, prompt_text: str, prompt_id: Optional[str], prepared: PreparedRun
+) -> Dict[str, Any]:
+    """
+    Generate through SingleFlight, joining an identical run already in flight here.
+    """
+    if key in _in_flight:
+        metrics.output_cache_lookups.inc(result="coalesced")
+    return await _in_flight.do(key, lambda: _generate(
+        key, video_url=video_url, prompt_text=prompt_text, prompt_id=prompt_id, prepared=prepared
+    ))
+
+async def run_prompt(
+    db: Session, *, video_url: str, prompt_text: str, prompt_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run a prompt on a video, reusing an existing output when there is one.
+
+    Database work runs in the threadpool and the LLM call is awaited on the
+    event loop, so an in-flight generation does not occupy a worker thread.
+    Concurrent identical runs share one LLM call: within a process through
+    SingleFlight, and across workers through a claim row in run_claims.
+
+    Returns:
+        Dict with the prompt ID and the LLM output
+    """
+    prepared = await prepare_run_async(
+        db, video_url=video_url, prompt_text=prompt_text, prompt_id=prompt_id
+    )
+    if prepared.cached_output is not None:
+        return {"promptId": prepared.prompt_id, "output": prepared.cached_output}
+
+    key = run_key(prepared.youtube_id, prompt_text, settings.GEMINI_MODEL)
+    return await _generate_shared(
+        key, video_url=video_url, prompt_text=prompt_text, prompt_id=prompt_id, prepared=prepared
+    )
+
+def plan_batch(
+    db: Session, *, video_urls: List[str], prompt_text: str, prompt_id: Optional[str] = None
+) -> BatchPlan:
+    """
+    Resolve one prompt against many videos with a fixed number of queries.
+
+    Duplicate URLs are collapsed and invalid ones become error items. Videos
+    that already have an output for the prompt and model are returned as
+    cached items so they are never sent to the LLM.
+
+    Raises:
+        PromptNotFoundError: If prompt_id is given but does not exist
+    """
+    ready = []
+    urls_by_id = {}
+    for video_url in video_urls:
+        try:
+            youtube_id = extract_youtube_id(video_url)
+        except ValueError as e:
+            ready.append({"videoUrl": video_url, "status": "error", "error": str(e)})
+            continue
+        urls_by_id.setdefault(youtube_id, video_url)
+
+    try:
+        prompt = get_or_create_prompt(db, prompt_text=prompt_text, prompt_id=prompt_id)
+        videos = crud_video.get_multi_by_youtube_ids(db, youtube_ids=list(urls_by_id))
+        outputs = crud_output.get_multi_for_prompt(
+            db, prompt_id=prompt.id, video_ids=[video.id for video in videos],
+            model=settings.GEMINI_MODEL
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    outputs_by_video = {output.video_id: output for output in outputs}
+    pending = []
+    for video in videos:
+        output = outputs_by_video.get(video.id)
+        if output:
+            ready.append({
+                "videoUrl": urls_by_id[video.youtube_id],
+                "youtubeId": video.youtube_id,
+                "promptId": output.prompt_id,
+                "status": "cached",
+                "output": output.llm_output
+            })
+        else:
+            pending.append((video.youtube_id, urls_by_id[video.youtube_id], video.id))
+
+    metrics.output_cache_lookups.inc(len(outputs_by_video), result="hit")
+    known = {video.youtube_id for video in videos}
+    missing = [(youtube_id, url) for youtube_id, url in urls_by_id.items() if youtube_id not in known]
+    return BatchPlan(prompt.id, prompt_text, ready, pending, missing)
+
+async def run_batch(plan: BatchPlan, *, concurrency: int) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a planned batch and yield one result item per video as it completes.
+
+    Metadata for new videos is fetched in bulk first. At most `concurrency`
+    LLM calls run at a time, each through the same single-flight path as
+    run_prompt.
+    """
+    for item in plan.ready:
+        yield item
+
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = list(plan.pending)
+
+    if plan.missing:
+        urls_by_id = dict(plan.missing)
+        db = SessionLocal()
+        try:
+            metadata_by_id = await run_in_threadpool(
+                youtube_service.get_video_metadata_bulk,
+                list(urls_by_id.values()),
+                priority=QuotaPriority.BULK
+            )
+            videos = await run_in_threadpool(
+                crud_video.create_many_from_metadata,
+                db,
+                metadata_by_id=metadata_by_id,
+                user_id=1  # TODO: Get from authenticated user
+            )
+            error = "Video not found or not accessible"
+        except Exception as e:
+            videos = {}
+            error = f"Failed to fetch video metadata: {str(e)}"
+        finally:
+            db.close()
+
+        for youtube_id, video_url in plan.missing:
+            video = videos.get(youtube_id)
+            if video is None:
+                yield {"videoUrl": video_url, "youtubeId": youtube_id, "status": "error", "error": error}
+            else:
+                pending.append((youtube_id, video_url, video.id))
+
+    async def run_one(youtube_id: str, video_url: str, video_id: int) -> Dict[str, Any]:
+        item = {"videoUrl": video_url, "youtubeId": youtube_id}
+        prepared = PreparedRun(video_id, youtube_id, plan.prompt_id, None)
+        key = run_key(youtube_id, plan.prompt_text, settings.GEMINI_MODEL)
+        async with semaphore:
+            try:
+                result = await _generate_shared(
+                    key, video_url=video_url, prompt_text=plan.prompt_text,
+                    prompt_id=plan.prompt_id, prepared=prepared
+                )
+            except Exception as e:
+                return {**item, "promptId": plan.prompt_id, "status": "error", "error": str(e)}
+        return {**item, **result, "status": "generated"}
+
+    tasks = [asyncio.ensure_future(run_one(*entry)) for entry in pending]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Stop queued work if the client goes away; started generations finish in SingleFlight
+        for task in tasks:
+            task.cancel()
+
+async def stream_prompt(
+    prepared: PreparedRun, *, video_url: str, prompt_text: str, prompt_id: Optional[str] = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run a prepared prompt, yielding (event, data) pairs as the output streams in.
+
+    Events are "chunk" ({"text"}) while generating and a final "done" with
+    the same payload run_prompt returns. The output is stored once, after the
+    last chunk. If an identical run is already in flight, its result is
+    awaited and sent as a single chunk instead of starting a second stream.
+    """
+    if prepared.cached_output is not None:
+        yield "chunk", {"text": prepared.cached_output.get("content", "")}
+        yield "done", {"promptId": prepared.prompt_id, "output": prepared.cached_output}
+        return
+
+    key = run_key(prepared.youtube_id, prompt_text, settings.GEMINI_MODEL)
+    db = SessionLocal()
+    try:
+        if key in _in_flight or not await run_in_threadpool(single_flight.try_claim, db, key):
+            result = await _generate_shared(
+                key, video_url=video_url, prompt_text=prompt_text, prompt_id=prompt_id, prepared=prepared
+            )
+            yield "chunk", {"text": result["output"].get("content", "")}
+            yield "done", result
+            return
+
+        try:
+            # The previous claim holder may have finished just before we claimed
+            cached = await run_in_threadpool(
+                load_cached_output, db, youtube_id=prepared.youtube_id,
+                prompt_text=prompt_text, prompt_id=prompt_id
+            )
+            if cached is not None:
+                metrics.output_cache_lookups.inc(result="coalesced")
+            else:
+                metrics.output_cache_lookups.inc(result="miss")
+                start_time = time.time()
+                streamed = llm_service.StreamResult()
+                async for text in llm_service.stream_prompt_async(
+                    video_url=video_url, prompt=prompt_text, result=streamed
+                ):
+                    yield "chunk", {"text": text}
+                time_taken = time.time() - start_time
+
+                output = streamed.output()
+                await run_in_threadpool(
+                    save_output, db, video_id=prepared.video_id, prompt_id=prepared.prompt_id,
+                    output=output, time_taken=time_taken
+                )
+        finally:
+            # Also runs if the client disconnects mid-stream; nothing partial is stored
+            await run_in_threadpool(single_flight.release_claim, db, key)
+
+        if cached is not None:
+            yield "chunk", {"text": cached["output"].get("content", "")}
+            yield "done", cached
+            return
+        yield "done", {"promptId": prepared.prompt_id, "output": output}
+    finally:
+        db.close()
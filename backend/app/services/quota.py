@@ -0,0 +1,150 @@
+from typing import Any, Dict, Tuple
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.api_quota_usage import ApiQuotaUsage
+from zoneinfo import ZoneInfo
+import datetime
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+YOUTUBE_API = "youtube"
+
+# YouTube Data API daily quota resets at midnight Pacific time
+_QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Quota units charged per call, from the YouTube Data API quota calculator
+YOUTUBE_UNIT_COSTS: Dict[str, int] = {
+    "videos.list": 1,
+    "channels.list": 1,
+    "captions.list": 50,
+    "search.list": 100,
+}
+
+class QuotaPriority:
+    """
+    Who is spending quota. Lower priorities may only use part of the daily
+    budget, so interactive lookups keep working after background work stops.
+    """
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+    BULK = "bulk"
+
+class QuotaExceededError(Exception):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+# (quota day, units still available) per priority, learnt from denied charges.
+# Usage only grows within a day, so this lets callers fail without a query.
+_headroom: Dict[str, Tuple[datetime.date, int]] = {}
+_lock = threading.Lock()
+
+def quota_day() -> datetime.date:
+    return datetime.datetime.now(_QUOTA_TIMEZONE).date()
+
+def seconds_until_reset() -> float:
+    now = datetime.datetime.now(_QUOTA_TIMEZONE)
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), _QUOTA_TIMEZONE)
+    return (midnight - now).total_seconds()
+
+def ceiling(priority: str) -> int:
+    """
+    Daily units a priority may consume, counting what every priority has spent.
+    """
+    share = {
+        QuotaPriority.INTERACTIVE: 1.0,
+        QuotaPriority.BACKGROUND: settings.YOUTUBE_QUOTA_BACKGROUND_SHARE,
+        QuotaPriority.BULK: settings.YOUTUBE_QUOTA_BULK_SHARE,
+    }[priority]
+    return int(settings.YOUTUBE_DAILY_QUOTA * share)
+
+def _denied(method: str, priority: str) -> QuotaExceededError:
+    return QuotaExceededError(
+        f"YouTube API quota for {priority} calls is exhausted until midnight Pacific time ({method})",
+        retry_after=seconds_until_reset()
+    )
+
+def charge(method: str, priority: str = QuotaPriority.INTERACTIVE) -> None:
+    """
+    Reserve the units for one YouTube API call against today's budget.
+
+    The check and the increment are a single conditional UPDATE, so concurrent
+    processes can never spend past a priority's ceiling. Commits in its own
+    session, so the caller's transaction is untouched.
+
+    Raises:
+        QuotaExceededError: If the call would take the priority over its ceiling
+    """
+    cost = YOUTUBE_UNIT_COSTS.get(method, 1)
+    limit = ceiling(priority)
+    day = quota_day()
+    with _lock:
+        known = _headroom.get(priority)
+    if known and known[0] == day and cost > known[1]:
+        raise _denied(method, priority)
+
+    db = SessionLocal()
+    try:
+        while True:
+            updated = db.query(ApiQuotaUsage).filter(
+                ApiQuotaUsage.api == YOUTUBE_API,
+                ApiQuotaUsage.day == day,
+                ApiQuotaUsage.units + cost <= limit
+            ).update({"units": ApiQuotaUsage.units + cost}, synchronize_session=False)
+            db.commit()
+            if updated:
+                return
+
+            used = db.query(ApiQuotaUsage.units).filter(
+                ApiQuotaUsage.api == YOUTUBE_API,
+                ApiQuotaUsage.day == day
+            ).scalar()
+            db.commit()
+            if used is not None:
+                with _lock:
+                    _headroom[priority] = (day, max(limit - used, 0))
+                logger.warning(f"YouTube quota ceiling reached for {priority} calls: {used}/{limit} units")
+                raise _denied(method, priority)
+
+            # First call of the day; start the row and try again
+            try:
+                db.add(ApiQuotaUsage(api=YOUTUBE_API, day=day, units=0))
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+    finally:
+        db.close()
+
+def exhaust() -> None:
+    """
+    Stop spending for the rest of the day after YouTube itself reports the
+    quota as exceeded (e.g. when other clients share the API key).
+    """
+    day = quota_day()
+    with _lock:
+        for priority in (QuotaPriority.INTERACTIVE, QuotaPriority.BACKGROUND, QuotaPriority.BULK):
+            _headroom[priority] = (day, 0)
+
+def usage() -> Dict[str, Any]:
+    day = quota_day()
+    db = SessionLocal()
+    try:
+        used = db.query(ApiQuotaUsage.units).filter(
+            ApiQuotaUsage.api == YOUTUBE_API,
+            ApiQuotaUsage.day == day
+        ).scalar() or 0
+    finally:
+        db.close()
+    return {
+        "day": day.isoformat(),
+        "units_used": used,
+        "daily_quota": settings.YOUTUBE_DAILY_QUOTA,
+        "ceilings": {
+            priority: ceiling(priority)
+            for priority in (QuotaPriority.INTERACTIVE, QuotaPriority.BACKGROUND, QuotaPriority.BULK)
+        },
+        "resets_in": round(seconds_until_reset()),
+    }
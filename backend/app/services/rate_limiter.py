@@ -0,0 +1,190 @@
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+import asyncio
+import random
+import threading
+import time
+
+# How long to wait before re-checking when every concurrency slot is taken
+_SLOT_POLL_INTERVAL = 0.05
+
+class TokenBucket:
+    """
+    Per-minute budget that refills continuously. Not thread-safe on its own.
+    """
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if self.capacity <= 0:
+            return 0.0  # Unlimited
+        self._refill(now)
+        # A single request larger than the whole budget waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.capacity > 0:
+            self.level -= amount
+
+    def adjust(self, amount: float) -> None:
+        """Refund (positive) or charge (negative) once the real cost is known."""
+        if self.capacity > 0:
+            self.level = min(self.capacity, self.level + amount)
+
+class AdaptiveLimiter:
+    """
+    Outbound limiter combining request and token budgets with AIMD concurrency.
+
+    Each call holds a slot while it runs. The number of slots grows additively
+    on success (about +increase_step per `limit` successes) and shrinks
+    multiplicatively when the upstream answers with a rate-limit error, so
+    throughput settles just under the real quota. Thread-safe, and usable
+    from both threads (slot) and async tasks (slot_async).
+    """
+    def __init__(
+        self,
+        name: str,
+        *,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        initial_concurrency: int,
+        min_concurrency: int,
+        max_concurrency: int,
+        decrease_factor: float,
+        increase_step: float,
+        is_rate_limit_error: Callable[[BaseException], bool],
+        decrease_cooldown: float = 2.0
+    ):
+        self.name = name
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.is_rate_limit_error = is_rate_limit_error
+        self.decrease_cooldown = decrease_cooldown
+        self._last_decrease = 0.0
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+        self.limit = float(initial_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.successes = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    def _try_acquire(self, tokens: float) -> float:
+        """Take a slot and budget if available; otherwise return seconds to wait."""
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                return _SLOT_POLL_INTERVAL
+            now = time.monotonic()
+            wait = max(self._requests.wait_time(1, now), self._tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            self.in_flight += 1
+            return 0.0
+
+    def _release(self, error: Optional[BaseException], reserved: float, used: Optional[float]) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if used is not None:
+                self._tokens.adjust(reserved - used)
+            if error is None:
+                self.successes += 1
+                self.limit = min(self.max_concurrency, self.limit + self.increase_step / max(self.limit, 1.0))
+            elif not isinstance(error, Exception):
+                pass  # Cancelled; says nothing about upstream health
+            elif self.is_rate_limit_error(error):
+                self.rate_limited += 1
+                # A burst of calls rejected together counts as one congestion signal
+                now = time.monotonic()
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.errors += 1
+
+    def acquire(self, tokens: float) -> None:
+        with self._lock:
+            self.waiting += 1
+        try:
+            while (wait := self._try_acquire(tokens)) > 0:
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    async def acquire_async(self, tokens: float) -> None:
+        with self._lock:
+            self.waiting += 1
+        try:
+            while (wait := self._try_acquire(tokens)) > 0:
+                await asyncio.sleep(wait)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    @contextmanager
+    def slot(self, tokens: float) -> Iterator["SlotUsage"]:
+        self.acquire(tokens)
+        usage = SlotUsage()
+        try:
+            yield usage
+        except BaseException as e:
+            self._release(e, tokens, usage.tokens)
+            raise
+        self._release(None, tokens, usage.tokens)
+
+    @asynccontextmanager
+    async def slot_async(self, tokens: float) -> AsyncIterator["SlotUsage"]:
+        await self.acquire_async(tokens)
+        usage = SlotUsage()
+        try:
+            yield usage
+        except BaseException as e:
+            self._release(e, tokens, usage.tokens)
+            raise
+        self._release(None, tokens, usage.tokens)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._requests._refill(now)
+            self._tokens._refill(now)
+            return {
+                "name": self.name,
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "requests_available": round(self._requests.level, 1),
+                "requests_per_minute": self._requests.capacity,
+                "tokens_available": round(self._tokens.level),
+                "tokens_per_minute": self._tokens.capacity,
+                "successes": self.successes,
+                "errors": self.errors,
+                "rate_limited": self.rate_limited,
+            }
+
+class SlotUsage:
+    """Lets the caller report the real token cost of the call holding a slot."""
+    def __init__(self):
+        self.tokens: Optional[float] = None
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with full jitter for the given zero-based retry attempt.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,77 @@
+from typing import Awaitable, Callable, Dict, TypeVar
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models.run_claim import RunClaim
+import asyncio
+import datetime
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single task.
+
+    The first caller for a key starts the task; later callers await the same
+    task until it finishes. The task is shielded, so a caller that goes away
+    does not cancel the work for everyone else.
+    """
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._tasks
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+def _stale_before() -> datetime.datetime:
+    return datetime.datetime.utcnow() - datetime.timedelta(seconds=settings.RUN_CLAIM_TTL)
+
+def try_claim(db: Session, key: str) -> bool:
+    """
+    Claim a run key across workers by inserting its claim row.
+
+    A claim older than RUN_CLAIM_TTL is treated as abandoned and replaced.
+
+    Returns:
+        True if this caller now owns the claim
+    """
+    try:
+        db.query(RunClaim).filter(
+            RunClaim.key == key,
+            RunClaim.claimed_at < _stale_before()
+        ).delete(synchronize_session=False)
+        db.add(RunClaim(key=key))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+def claim_is_live(db: Session, key: str) -> bool:
+    """
+    Check whether another worker still holds a fresh claim on the key.
+    """
+    claim = db.query(RunClaim.key).filter(
+        RunClaim.key == key,
+        RunClaim.claimed_at >= _stale_before()
+    ).first()
+    db.commit()
+    return claim is not None
+
+def release_claim(db: Session, key: str) -> None:
+    db.query(RunClaim).filter(RunClaim.key == key).delete(synchronize_session=False)
+    db.commit()
@@ -1,12 +1,18 @@
-from googleapiclient.discovery import build
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import re
 import time
 from urllib.parse import urlparse, parse_qs
 import logging
 import os
 from datetime import datetime
+from sqlalchemy.orm import Session
+from app.core import metrics
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.db.models.video import Video
+from app.services import clients, quota
+from app.services.quota import QuotaExceededError, QuotaPriority
+from app.services.rate_limiter import backoff_delay
 logger = logging.getLogger(__name__)
 
 def extract_video_id(url: str) -> str:
@@ -27,115 +33,357 @@ def extract_video_id(url: str) -> str:
     
     raise ValueError("Invalid YouTube URL format")
 
-def get_video_metadata(url: str, api_key: str = None, max_retries: int = 3) -> Dict[str, Any]:
+class MetadataNotCachedError(LookupError):
+    pass
+
+# First cache tier; the second is the videos.video_metadata column
+_metadata_cache: LRUCache[Dict[str, Any]] = LRUCache(
+    maxsize=settings.YOUTUBE_METADATA_CACHE_SIZE,
+    ttl=settings.YOUTUBE_METADATA_CACHE_TTL
+)
+
+metrics.registry.collector(
+    "youtube_metadata_cache_lookups_total",
+    "Lookups in the in-process YouTube metadata cache, by result.",
+    "counter",
+    lambda: [({"result": "hit"}, _metadata_cache.hits), ({"result": "miss"}, _metadata_cache.misses)]
+)
+
+def _metadata_age(metadata: Dict[str, Any]) -> float:
+    return time.time() - metadata.get("metadata_fetched_at", 0)
+
+def get_cached_metadata(
+    video_id: str, max_age: Optional[float] = None, db: Optional[Session] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Look up metadata in the in-process cache, then in the database if `db` is given.
+
+    Args:
+        video_id: YouTube video ID
+        max_age: Maximum age in seconds of acceptable metadata; None accepts any age
+        db: Optional session used for the database tier
+
+    Returns:
+        Cached metadata dict, or None if nothing fresh enough is cached
+    """
+    metadata = _metadata_cache.get(video_id)
+    if metadata is not None and (max_age is None or _metadata_age(metadata) <= max_age):
+        return metadata
+
+    if db is not None:
+        metadata = db.query(Video.video_metadata).filter(Video.youtube_id == video_id).scalar()
+        if metadata and (max_age is None or _metadata_age(metadata) <= max_age):
+            _metadata_cache.set(video_id, metadata)
+            return metadata
+    return None
+
+def get_video_metadata(
+    url: str,
+    api_key: str = None,
+    max_retries: int = 3,
+    max_age: Optional[float] = None,
+    cached_only: bool = False,
+    db: Optional[Session] = None,
+    priority: str = QuotaPriority.INTERACTIVE
+) -> Dict[str, Any]:
     """
-    Get video metadata from YouTube using the YouTube Data API.
+    Get video metadata, from cache when it is recent enough, else from the YouTube Data API.
     
     Args:
         url: YouTube video URL
         api_key: YouTube Data API key (can be set via YOUTUBE_API_KEY environment variable)
         max_retries: Maximum number of retry attempts
+        max_age: Staleness policy in seconds. 0 always fetches fresh metadata;
+            None uses YOUTUBE_METADATA_MAX_AGE
+        cached_only: Never call the API; return cached metadata of any age
+        db: Optional session; enables the videos.video_metadata cache tier, and
+            freshly fetched metadata is written back to an existing video row
+            (the caller commits)
+        priority: QuotaPriority the API calls are charged under. When its
+            quota is exhausted, cached metadata of any age is returned instead
         
     Returns:
         Dict containing video metadata
         
     Raises:
         ValueError: If URL is invalid or API key is missing
+        MetadataNotCachedError: If cached_only is set and nothing is cached
+        QuotaExceededError: If the quota is exhausted and nothing is cached
         Exception: If metadata cannot be fetched after retries
     """
-    # Use API key from arguments or environment variable
-    api_key = api_key or settings.YOUTUBE_API_KEY
-    if not api_key:
-        raise ValueError("YouTube API key is required. Set it as an argument or YOUTUBE_API_KEY environment variable.")
-    
     video_id = extract_video_id(url)
+
+    if max_age is None:
+        max_age = settings.YOUTUBE_METADATA_MAX_AGE
+    if cached_only or max_age > 0:
+        metadata = get_cached_metadata(video_id, max_age=None if cached_only else max_age, db=db)
+        if metadata is not None:
+            return metadata
+        if cached_only:
+            raise MetadataNotCachedError(f"No cached metadata for video {video_id}")
+
+    try:
+        metadata = _fetch_video_metadata(
+            video_id, api_key=api_key, max_retries=max_retries, priority=priority
+        )
+    except QuotaExceededError:
+        metadata = get_cached_metadata(video_id, db=db)
+        if metadata is None:
+            raise
+        logger.warning(f"YouTube quota exhausted; serving cached metadata for video {video_id}")
+        return metadata
+    _metadata_cache.set(video_id, metadata)
+    if db is not None:
+        db.query(Video).filter(Video.youtube_id == video_id).update(
+            {"video_metadata": metadata}, synchronize_session=False
+        )
+    return metadata
+
+def _parse_duration(duration_str: str) -> int:
+    # Convert PT1H2M3S format to seconds
+    duration_seconds = 0
+    hours_match = re.search(r'(\d+)H', duration_str)
+    minutes_match = re.search(r'(\d+)M', duration_str)
+    seconds_match = re.search(r'(\d+)S', duration_str)
+    
+    if hours_match:
+        duration_seconds += int(hours_match.group(1)) * 3600
+    if minutes_match:
+        duration_seconds += int(minutes_match.group(1)) * 60
+    if seconds_match:
+        duration_seconds += int(seconds_match.group(1))
+    return duration_seconds
+
+def _build_metadata(video_data: Dict[str, Any], channel_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build our metadata dict from a videos.list item and its channel snippet.
+    """
+    video_id = video_data['id']
+    snippet = video_data['snippet']
+    statistics = video_data['statistics']
+    content_details = video_data['contentDetails']
+    status = video_data['status']
+    
+    # Parse duration (ISO 8601 format)
+    duration_str = content_details['duration']
+    duration_seconds = _parse_duration(duration_str)
     
+    # Format publish date
+    publish_date = None
+    if snippet.get('publishedAt'):
+        publish_date = datetime.fromisoformat(snippet['publishedAt'].replace('Z', '+00:00'))
+    
+    # Construct metadata dictionary
+    return {
+        "title": snippet.get('title'),
+        "channel": snippet.get('channelTitle'),
+        "channel_id": snippet.get('channelId'),
+        "duration": duration_str,
+        "description": snippet.get('description'),
+        "views": int(statistics.get('viewCount', 0)),
+        "publish_date": publish_date.isoformat() if publish_date else None,
+        "keywords": snippet.get('tags', []),
+        "thumbnail_url": snippet.get('thumbnails', {}).get('high', {}).get('url'),
+        "video_id": video_id,
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "captions": bool(content_details.get('caption') == 'true'),
+        "age_restricted": bool(content_details.get('contentRating', {})),
+        "rating": round(float(statistics.get('likeCount', 0)) / max(1, float(statistics.get('viewCount', 1))) * 5, 2),
+        "length_seconds": duration_seconds,
+        "like_count": int(statistics.get('likeCount', 0)),
+        "comment_count": int(statistics.get('commentCount', 0)),
+        "privacy_status": status.get('privacyStatus'),
+        "channel_logo": channel_data.get('thumbnails', {}).get('default', {}).get('url'),
+        "metadata_fetched_at": time.time()
+    }
+
+# Transient statuses worth retrying; other HTTP errors fail immediately
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def _http_status(e: BaseException) -> Optional[int]:
+    resp = getattr(e, "resp", None)
+    return getattr(resp, "status", None)
+
+def _is_quota_exceeded(e: BaseException) -> bool:
+    # YouTube reports an exhausted daily quota as 403 with reason quotaExceeded
+    return _http_status(e) == 403 and "quotaExceeded" in str(getattr(e, "content", b""))
+
+def _execute(
+    request, method: str, description: str, max_retries: int,
+    priority: str = QuotaPriority.INTERACTIVE
+) -> Dict[str, Any]:
+    """
+    Execute a YouTube API request, charging its quota units before each attempt.
+
+    Transient failures (network errors, 429 and 5xx) are retried with jittered
+    exponential backoff.
+
+    Raises:
+        QuotaExceededError: If the quota for `priority` is exhausted
+    """
     for attempt in range(max_retries):
+        quota.charge(method, priority)
         try:
-            # Build the YouTube API client
-            youtube = build('youtube', 'v3', developerKey=api_key)
-            
-            # Get video details
-            video_response = youtube.videos().list(
-                part="snippet,contentDetails,statistics,status",
-                id=video_id
-            ).execute()
-            
-            if not video_response.get('items'):
-                raise ValueError(f"Video {video_id} not found or not accessible")
-            
-            video_data = video_response['items'][0]
-            snippet = video_data['snippet']
-            statistics = video_data['statistics']
-            content_details = video_data['contentDetails']
-            status = video_data['status']
-            
-            # Parse duration (ISO 8601 format)
-            duration_str = content_details['duration']
-            # Convert PT1H2M3S format to seconds
-            duration_seconds = 0
-            hours_match = re.search(r'(\d+)H', duration_str)
-            minutes_match = re.search(r'(\d+)M', duration_str)
-            seconds_match = re.search(r'(\d+)S', duration_str)
-            
-            if hours_match:
-                duration_seconds += int(hours_match.group(1)) * 3600
-            if minutes_match:
-                duration_seconds += int(minutes_match.group(1)) * 60
-            if seconds_match:
-                duration_seconds += int(seconds_match.group(1))
-            
-            # Format publish date
-            publish_date = None
-            if snippet.get('publishedAt'):
-                publish_date = datetime.fromisoformat(snippet['publishedAt'].replace('Z', '+00:00'))
-            
-            # Get channel details
-            channel_response = youtube.channels().list(
-                part="snippet",
-                id=snippet['channelId']
-            ).execute()
-            
-            channel_data = {}
-            if channel_response.get('items'):
-                channel_data = channel_response['items'][0]['snippet']
-            
-            # Construct metadata dictionary
-            metadata = {
-                "title": snippet.get('title'),
-                "channel": snippet.get('channelTitle'),
-                "channel_id": snippet.get('channelId'),
-                "duration": duration_str,
-                "description": snippet.get('description'),
-                "views": int(statistics.get('viewCount', 0)),
-                "publish_date": publish_date.isoformat() if publish_date else None,
-                "keywords": snippet.get('tags', []),
-                "thumbnail_url": snippet.get('thumbnails', {}).get('high', {}).get('url'),
-                "video_id": video_id,
-                "url": f"https://www.youtube.com/watch?v={video_id}",
-                "captions": bool(content_details.get('caption') == 'true'),
-                "age_restricted": bool(content_details.get('contentRating', {})),
-                "rating": round(float(statistics.get('likeCount', 0)) / max(1, float(statistics.get('viewCount', 1))) * 5, 2),
-                "length_seconds": duration_seconds,
-                "like_count": int(statistics.get('likeCount', 0)),
-                "comment_count": int(statistics.get('commentCount', 0)),
-                "privacy_status": status.get('privacyStatus'),
-                "channel_logo": channel_data.get('thumbnails', {}).get('default', {}).get('url'),
-                "metadata_fetched_at": time.time()
-            }
-            
-            logger.info(f"Successfully fetched metadata for video {video_id}")
-            return metadata
-            
+            with metrics.external_call("youtube", method):
+                return request.execute(http=clients.youtube_http())
         except Exception as e:
-            if attempt == max_retries - 1:
-                logger.error(f"Failed to fetch metadata for video {video_id} after {max_retries} attempts: {str(e)}")
+            if _is_quota_exceeded(e):
+                quota.exhaust()
+                raise QuotaExceededError(
+                    f"YouTube reported the daily quota as exceeded ({method})",
+                    retry_after=quota.seconds_until_reset()
+                )
+            status = _http_status(e)
+            if (status is not None and status not in RETRYABLE_STATUS_CODES) or attempt == max_retries - 1:
+                logger.error(f"Failed to fetch {description} after {attempt + 1} attempts: {str(e)}")
                 raise Exception(f"Error fetching video metadata: {str(e)}")
             
-            logger.warning(f"Attempt {attempt + 1} failed for video {video_id}, retrying...")
-            time.sleep(1)  # Wait before retrying
+            delay = backoff_delay(attempt, settings.YOUTUBE_RETRY_BASE_DELAY, settings.YOUTUBE_RETRY_MAX_DELAY)
+            logger.warning(f"Attempt {attempt + 1} failed for {description}, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+def _require_api_key(api_key: Optional[str]) -> str:
+    # Use API key from arguments or environment variable
+    api_key = api_key or settings.YOUTUBE_API_KEY
+    if not api_key:
+        raise ValueError("YouTube API key is required. Set it as an argument or YOUTUBE_API_KEY environment variable.")
+    return api_key
 
-def get_video_transcript(url: str, api_key: str = None) -> str:
+def _fetch_video_metadata(
+    video_id: str, api_key: str = None, max_retries: int = 3,
+    priority: str = QuotaPriority.INTERACTIVE
+) -> Dict[str, Any]:
+    """
+    Fetch video metadata from the YouTube Data API.
+    """
+    metadata = _fetch_video_metadata_bulk(
+        [video_id], api_key=api_key, max_retries=max_retries, priority=priority
+    )
+    if video_id not in metadata:
+        raise ValueError(f"Video {video_id} not found or not accessible")
+    
+    logger.info(f"Successfully fetched metadata for video {video_id}")
+    return metadata[video_id]
+
+def _fetch_video_metadata_bulk(
+    video_ids: List[str], api_key: str = None, max_retries: int = 3,
+    priority: str = QuotaPriority.BULK
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch metadata for many videos with batched videos.list and channels.list calls.
+
+    Each call covers up to YOUTUBE_BATCH_SIZE ids (the API maximum is 50), and
+    each channel is fetched once no matter how many of the videos it owns.
+    Videos that are not found or not accessible are left out of the result.
+    """
+    api_key = _require_api_key(api_key)
+    video_ids = list(dict.fromkeys(video_ids))
+    batch_size = min(settings.YOUTUBE_BATCH_SIZE, 50)
+
+    youtube = clients.get_youtube_client(api_key)
+
+    video_items = []
+    for i in range(0, len(video_ids), batch_size):
+        chunk = video_ids[i:i + batch_size]
+        video_response = _execute(
+            youtube.videos().list(
+                part="snippet,contentDetails,statistics,status",
+                id=",".join(chunk),
+                maxResults=len(chunk)
+            ),
+            "videos.list",
+            f"videos {chunk[0]}..{chunk[-1]}",
+            max_retries,
+            priority
+        )
+        video_items.extend(video_response.get('items', []))
+
+    channel_ids = list(dict.fromkeys(item['snippet']['channelId'] for item in video_items))
+    channels = {}
+    for i in range(0, len(channel_ids), batch_size):
+        chunk = channel_ids[i:i + batch_size]
+        channel_response = _execute(
+            youtube.channels().list(
+                part="snippet",
+                id=",".join(chunk),
+                maxResults=len(chunk)
+            ),
+            "channels.list",
+            f"channels {chunk[0]}..{chunk[-1]}",
+            max_retries,
+            priority
+        )
+        for item in channel_response.get('items', []):
+            channels[item['id']] = item['snippet']
+
+    return {
+        item['id']: _build_metadata(item, channels.get(item['snippet']['channelId'], {}))
+        for item in video_items
+    }
+
+def get_video_metadata_bulk(
+    urls: List[str],
+    api_key: str = None,
+    max_retries: int = 3,
+    max_age: Optional[float] = None,
+    db: Optional[Session] = None,
+    priority: str = QuotaPriority.BULK
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get metadata for many videos, calling the API only for ids not fresh in cache.
+
+    Args:
+        urls: YouTube video URLs; duplicates are collapsed
+        api_key: YouTube Data API key (can be set via YOUTUBE_API_KEY environment variable)
+        max_retries: Maximum number of retry attempts per API call
+        max_age: Staleness policy in seconds, as for get_video_metadata
+        db: Optional session enabling the videos.video_metadata cache tier
+        priority: QuotaPriority the API calls are charged under. When its
+            quota is exhausted, cached metadata of any age is used instead
+
+    Returns:
+        Dict mapping video ID to metadata; videos that were not found are omitted
+
+    Raises:
+        ValueError: If a URL is invalid or the API key is missing
+        QuotaExceededError: If the quota is exhausted and some videos are not cached
+        Exception: If a batch cannot be fetched after retries
+    """
+    video_ids = list(dict.fromkeys(extract_video_id(url) for url in urls))
+    if max_age is None:
+        max_age = settings.YOUTUBE_METADATA_MAX_AGE
+
+    metadata_by_id = {}
+    to_fetch = []
+    for video_id in video_ids:
+        metadata = get_cached_metadata(video_id, max_age=max_age, db=db) if max_age > 0 else None
+        if metadata is not None:
+            metadata_by_id[video_id] = metadata
+        else:
+            to_fetch.append(video_id)
+
+    if to_fetch:
+        try:
+            fetched = _fetch_video_metadata_bulk(
+                to_fetch, api_key=api_key, max_retries=max_retries, priority=priority
+            )
+        except QuotaExceededError:
+            stale = {video_id: get_cached_metadata(video_id, db=db) for video_id in to_fetch}
+            if any(metadata is None for metadata in stale.values()):
+                raise
+            logger.warning(f"YouTube quota exhausted; serving cached metadata for {len(stale)} videos")
+            metadata_by_id.update(stale)
+            return metadata_by_id
+        for video_id, metadata in fetched.items():
+            _metadata_cache.set(video_id, metadata)
+        metadata_by_id.update(fetched)
+        logger.info(f"Fetched metadata for {len(fetched)} of {len(to_fetch)} uncached videos")
+    return metadata_by_id
+
+
+def get_video_transcript(
+    url: str, api_key: str = None, priority: str = QuotaPriority.INTERACTIVE
+) -> str:
     """
     Get video transcript from YouTube using the YouTube Data API.
     
@@ -149,13 +397,19 @@ def get_video_transcript(url: str, api_key: str = None) -> str:
     
     try:
         video_id = extract_video_id(url)
-        youtube = build('youtube', 'v3', developerKey=api_key)
+        youtube = clients.get_youtube_client(api_key)
         
         # Get caption tracks
-        captions_response = youtube.captions().list(
-            part="snippet",
-            videoId=video_id
-        ).execute()
+        captions_response = _execute(
+            youtube.captions().list(
+                part="snippet",
+                videoId=video_id
+            ),
+            "captions.list",
+            f"captions {video_id}",
+            max_retries=3,
+            priority=priority
+        )
         
         caption_tracks = []
         if captions_response.get('items'):
@@ -168,6 +422,8 @@ def get_video_transcript(url: str, api_key: str = None) -> str:
         
         return f"Found {len(caption_tracks)} caption tracks: {caption_tracks}"
         
+    except QuotaExceededError:
+        raise
     except Exception as e:
         raise Exception(f"Error fetching video caption information: {str(e)}")
 
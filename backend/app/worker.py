@@ -0,0 +1,159 @@
+"""
+Background worker for prompt x video jobs submitted through POST /api/jobs.
+
+Usage:
+    python -m app.worker [--concurrency N] [--poll-interval SECONDS]
+
+Run as many worker processes as needed; items are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED so workers never share an item. Items held
+by a worker that dies are reclaimed once their lease (JOB_ITEM_LEASE) expires.
+"""
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.hashing import run_key
+from app.crud import crud_job, crud_output
+from app.crud.crud_job import ClaimedItem
+from app.db.database import SessionLocal
+from app.services import llm_service, prompt_runner, single_flight
+from app.services.quota import QuotaExceededError, QuotaPriority
+import argparse
+import logging
+import random
+import signal
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class ClaimHeldError(Exception):
+    """Another worker or request is generating the same output."""
+
+def _generate_output(db: Session, item: ClaimedItem) -> Optional[str]:
+    """
+    Produce the output for a claimed item and return its ID.
+
+    Raises:
+        ClaimHeldError: If the same output is being generated elsewhere
+    """
+    prepared = prompt_runner.prepare_run(
+        db, video_url=item.video_url, prompt_text=item.prompt_text, prompt_id=item.prompt_id,
+        priority=QuotaPriority.BACKGROUND
+    )
+    if prepared.cached_output is None:
+        key = run_key(prepared.youtube_id, item.prompt_text, settings.GEMINI_MODEL)
+        if not single_flight.try_claim(db, key):
+            raise ClaimHeldError(key)
+        try:
+            cached = prompt_runner.load_cached_output(
+                db, youtube_id=prepared.youtube_id, prompt_text=item.prompt_text, prompt_id=item.prompt_id
+            )
+            if cached is None:
+                start_time = time.time()
+                output = llm_service.run_prompt(
+                    video_url=item.video_url,
+                    prompt=item.prompt_text
+                )
+                time_taken = time.time() - start_time
+                prompt_runner.save_output(
+                    db, video_id=prepared.video_id, prompt_id=item.prompt_id,
+                    output=output, time_taken=time_taken
+                )
+        finally:
+            single_flight.release_claim(db, key)
+
+    output = crud_output.get_cached(
+        db, youtube_id=prepared.youtube_id, model=settings.GEMINI_MODEL, prompt_id=item.prompt_id,
+        with_content=False
+    )
+    db.commit()
+    return output.id if output else None
+
+def process_item(db: Session, item: ClaimedItem) -> None:
+    try:
+        output_id = _generate_output(db, item)
+    except ClaimHeldError:
+        # Pick the item up again once the other run has stored its output
+        crud_job.retry_item(
+            db, item_id=item.id, delay=settings.WORKER_POLL_INTERVAL, count_attempt=False
+        )
+        return
+    except QuotaExceededError as e:
+        # Not the item's fault; wait for the daily quota to reset
+        db.rollback()
+        logger.warning(f"Job item {item.id} deferred: {str(e)}")
+        crud_job.retry_item(
+            db, item_id=item.id, delay=e.retry_after, error=str(e), count_attempt=False
+        )
+        return
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Job item {item.id} failed on attempt {item.attempts}: {str(e)}")
+        if item.attempts >= settings.JOB_ITEM_MAX_ATTEMPTS:
+            crud_job.fail_item(db, item_id=item.id, error=str(e))
+        else:
+            delay = settings.JOB_RETRY_BACKOFF * 2 ** (item.attempts - 1)
+            crud_job.retry_item(db, item_id=item.id, delay=delay * random.uniform(0.5, 1.5), error=str(e))
+        return
+
+    crud_job.complete_item(db, item_id=item.id, output_id=output_id)
+    logger.info(f"Job item {item.id} done")
+
+def work_loop(stop: threading.Event, poll_interval: float) -> None:
+    """
+    Claim and process items one at a time until `stop` is set.
+    """
+    db = SessionLocal()
+    try:
+        while not stop.is_set():
+            try:
+                items = crud_job.claim_items(
+                    db,
+                    limit=1,
+                    lease_seconds=settings.JOB_ITEM_LEASE,
+                    max_attempts=settings.JOB_ITEM_MAX_ATTEMPTS
+                )
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to claim job items: {str(e)}")
+                items = []
+            if not items:
+                stop.wait(poll_interval)
+                continue
+            for item in items:
+                process_item(db, item)
+    finally:
+        db.close()
+
+def run(concurrency: int, poll_interval: float) -> None:
+    stop = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info("Shutting down after current items finish")
+        stop.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    threads = [
+        threading.Thread(target=work_loop, args=(stop, poll_interval), name=f"worker-{i}")
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    logger.info(f"Worker started with {concurrency} threads")
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=1)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process queued prompt x video job items.")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=settings.WORKER_POLL_INTERVAL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(levelname)s %(message)s")
+    run(args.concurrency, args.poll_interval)
+
+if __name__ == "__main__":
+    main()
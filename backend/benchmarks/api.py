@@ -0,0 +1,371 @@
+"""
+Offline API benchmark with fake YouTube and Gemini backends.
+
+Usage:
+    python -m benchmarks.api [--scenario NAME ...] [--database-url URL]
+        [--requests N] [--concurrency N] [--youtube-latency S] [--llm-latency S]
+        [--error-rate P] [--save FILE] [--baseline FILE] [--max-regression PCT]
+
+The FastAPI app runs in-process behind httpx's ASGI transport, against a
+throwaway SQLite database or --database-url (e.g. a local Postgres; its
+tables are created if missing). youtube_service and llm_service are replaced
+with fakes that sleep for the given latency and fail at the given rate, so
+no network access or API keys are needed. Scenarios:
+
+    cold        first run of a prompt on new videos (metadata fetch and LLM call)
+    cache_hit   the same runs again, answered from stored outputs
+    listing     paging through GET /api/videos and GET /api/prompts
+    duplicates  bursts of identical concurrent runs on a new video
+
+cache_hit and listing seed their data with an unreported cold pass when cold
+is not selected. Each scenario reports req/s, p50/p95/p99 latency, SQL
+queries per request and the calls that reached the fakes. With --baseline
+(a file written by --save), the run fails (exit status 1) if any scenario's
+throughput drops or its p95 grows by more than --max-regression percent.
+"""
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import string
+import sys
+import tempfile
+import threading
+import time
+
+SCENARIOS = ("cold", "cache_hit", "listing", "duplicates")
+PROMPT = "Summarize this video in three bullet points."
+
+class FakeBackends:
+    """
+    Stand-ins for the YouTube and Gemini calls made by prompt_runner.
+
+    Counts every call, so scenarios can check how many reached the "APIs".
+    """
+    def __init__(self, youtube_latency: float, llm_latency: float, error_rate: float, seed: int):
+        self.youtube_latency = youtube_latency
+        self.llm_latency = llm_latency
+        self.error_rate = error_rate
+        self.calls: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self, name: str) -> bool:
+        """Count a call and decide whether it fails."""
+        with self._lock:
+            self.calls[name] += 1
+            return self._random.random() < self.error_rate
+
+    def _metadata(self, video_id: str) -> Dict[str, Any]:
+        return {
+            "title": f"Benchmark video {video_id}",
+            "channel": "Benchmark channel",
+            "description": "Lorem ipsum dolor sit amet. " * 40,
+            "duration": "PT4M13S",
+            "length_seconds": 253,
+            "video_id": video_id,
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+            "metadata_fetched_at": time.time(),
+        }
+
+    def get_video_metadata(self, url: str, *args, **kwargs) -> Dict[str, Any]:
+        from app.services import youtube_service
+
+        video_id = youtube_service.extract_video_id(url)
+        failed = self._call("youtube.videos")
+        time.sleep(self.youtube_latency)
+        if failed:
+            raise Exception("Fake YouTube API error")
+        return self._metadata(video_id)
+
+    def get_video_metadata_bulk(self, urls: List[str], *args, **kwargs) -> Dict[str, Dict[str, Any]]:
+        from app.services import youtube_service
+
+        failed = self._call("youtube.videos")
+        time.sleep(self.youtube_latency)
+        if failed:
+            raise Exception("Fake YouTube API error")
+        video_ids = [youtube_service.extract_video_id(url) for url in urls]
+        return {video_id: self._metadata(video_id) for video_id in video_ids}
+
+    def _output(self, video_url: str) -> Dict[str, Any]:
+        from app.services import llm_service
+
+        return llm_service.format_output(f"- Fake summary of {video_url}\n" * 3)
+
+    def run_prompt(self, video_url: str, prompt: str) -> Dict[str, Any]:
+        from app.services import llm_service
+
+        failed = self._call("gemini.generate")
+        time.sleep(self.llm_latency)
+        if failed:
+            raise llm_service.LLMError("Error running prompt: fake Gemini error")
+        return self._output(video_url)
+
+    async def run_prompt_async(self, video_url: str, prompt: str) -> Dict[str, Any]:
+        from app.services import llm_service
+
+        failed = self._call("gemini.generate")
+        await asyncio.sleep(self.llm_latency)
+        if failed:
+            raise llm_service.LLMError("Error running prompt: fake Gemini error")
+        return self._output(video_url)
+
+    async def stream_prompt_async(self, video_url: str, prompt: str, result=None):
+        from app.services import llm_service
+
+        failed = self._call("gemini.generate")
+        await asyncio.sleep(self.llm_latency)
+        if failed:
+            raise llm_service.LLMError("Error running prompt: fake Gemini error")
+        text = self._output(video_url)["content"]
+        if result is not None:
+            result.chunks.append(text)
+        yield text
+
+    def install(self) -> None:
+        from app.services import llm_service, youtube_service
+
+        youtube_service.get_video_metadata = self.get_video_metadata
+        youtube_service.get_video_metadata_bulk = self.get_video_metadata_bulk
+        llm_service.run_prompt = self.run_prompt
+        llm_service.run_prompt_async = self.run_prompt_async
+        llm_service.stream_prompt_async = self.stream_prompt_async
+
+class QueryCounter:
+    """Counts SQL statements executed through the app's engines."""
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _after_cursor_execute(self, *args) -> None:
+        with self._lock:
+            self.count += 1
+
+    def attach(self, engine) -> None:
+        from sqlalchemy import event
+
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class Run:
+    """Latencies and status codes collected while a scenario runs."""
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+
+    async def request(self, client, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies.append(time.perf_counter() - start)
+        self.statuses[response.status_code] += 1
+        return response
+
+async def _run_scenario(
+    name: str, body: Callable[[Run], Awaitable[None]], fakes: FakeBackends, queries: QueryCounter
+) -> Dict[str, Any]:
+    run = Run()
+    calls_before = Counter(fakes.calls)
+    queries_before = queries.count
+    start = time.perf_counter()
+    await body(run)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(run.latencies)
+    requests = len(latencies)
+    return {
+        "scenario": name,
+        "requests": requests,
+        "seconds": round(elapsed, 3),
+        "req_per_s": round(requests / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "queries_per_request": round((queries.count - queries_before) / requests, 1) if requests else 0.0,
+        "statuses": {str(status): count for status, count in sorted(run.statuses.items())},
+        "backend_calls": dict(fakes.calls - calls_before),
+    }
+
+def _video_url(run_id: str, index: int) -> str:
+    # 11 characters like a real YouTube ID, unique per benchmark run
+    return f"https://www.youtube.com/watch?v={run_id}{index:06d}"
+
+async def _bounded(concurrency: int, jobs: List[Callable[[], Awaitable[Any]]]) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(job):
+        async with semaphore:
+            await job()
+
+    await asyncio.gather(*(run(job) for job in jobs))
+
+def _run_prompt_jobs(client, run: Run, urls: List[str]) -> List[Callable[[], Awaitable[Any]]]:
+    return [
+        lambda url=url: run.request(
+            client, "POST", "/api/prompts/run_prompt", json={"videoUrl": url, "prompt": PROMPT}
+        )
+        for url in urls
+    ]
+
+async def _listing(client, run: Run, requests: int, concurrency: int) -> None:
+    remaining = [requests]
+
+    async def walk(path: str) -> None:
+        cursor = None
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            params = {"limit": 50, **({"cursor": cursor} if cursor else {})}
+            response = await run.request(client, "GET", path, params=params)
+            cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+
+    paths = ["/api/videos/", "/api/prompts/"]
+    await asyncio.gather(*(walk(paths[i % len(paths)]) for i in range(concurrency)))
+
+async def _duplicates(
+    client, run: Run, requests: int, concurrency: int, run_id: str, first_index: int
+) -> None:
+    # Each burst is `concurrency` identical first-time runs for one new video
+    for burst in range(max(1, requests // concurrency)):
+        url = _video_url(run_id, first_index + burst)
+        await asyncio.gather(*(job() for job in _run_prompt_jobs(client, run, [url] * concurrency)))
+
+async def run_benchmark(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    import httpx
+    from app.db import async_database, database
+    from app.db.base_class import Base
+    from app.db.models import User
+    from app.main import app
+
+    Base.metadata.create_all(database.engine)
+    db = database.SessionLocal()
+    try:
+        # Videos and prompts are created for the hard-coded user 1
+        if db.get(User, 1) is None:
+            db.add(User(id=1, email="benchmark@example.com"))
+            db.commit()
+    finally:
+        db.close()
+
+    fakes = FakeBackends(args.youtube_latency, args.llm_latency, args.error_rate, args.seed)
+    fakes.install()
+    queries = QueryCounter()
+    queries.attach(database.engine)
+    queries.attach(async_database.get_async_engine().sync_engine)
+
+    # New video IDs on every run, so cold runs stay cold against a reused database
+    run_id = "".join(random.choices(string.ascii_lowercase, k=5))
+    cold_urls = [_video_url(run_id, i) for i in range(args.requests)]
+    selected = args.scenario or list(SCENARIOS)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        scenarios: List[Tuple[str, Callable[[Run], Awaitable[None]]]] = [
+            ("cold", lambda run: _bounded(args.concurrency, _run_prompt_jobs(client, run, cold_urls))),
+            ("cache_hit", lambda run: _bounded(args.concurrency, _run_prompt_jobs(client, run, cold_urls))),
+            ("listing", lambda run: _listing(client, run, args.requests, args.concurrency)),
+            ("duplicates", lambda run: _duplicates(
+                client, run, args.requests, args.concurrency, run_id, args.requests
+            )),
+        ]
+        seed_needed = "cold" not in selected and ({"cache_hit", "listing"} & set(selected))
+        for name, body in scenarios:
+            if name in selected:
+                results.append(await _run_scenario(name, body, fakes, queries))
+            elif name == "cold" and seed_needed:
+                await _run_scenario(name, body, fakes, queries)
+    # The in-process transport does not run the app's lifespan
+    await async_database.dispose_async_engine()
+    return results
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], max_regression: float) -> List[str]:
+    """
+    Returns:
+        A description of every scenario that regressed against the baseline
+    """
+    failures = []
+    previous = {result["scenario"]: result for result in baseline}
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        limit = max_regression / 100
+        if result["req_per_s"] < before["req_per_s"] * (1 - limit):
+            failures.append(
+                f"{result['scenario']}: {result['req_per_s']} req/s, baseline {before['req_per_s']}"
+            )
+        if result["p95_ms"] > before["p95_ms"] * (1 + limit):
+            failures.append(
+                f"{result['scenario']}: p95 {result['p95_ms']} ms, baseline {before['p95_ms']}"
+            )
+    return failures
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'scenario':<12}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries/req':>13}  statuses / backend calls")
+    for result in results:
+        calls = ", ".join(f"{name}={count}" for name, count in sorted(result["backend_calls"].items()))
+        statuses = ", ".join(f"{status}x{count}" for status, count in result["statuses"].items())
+        print(
+            f"{result['scenario']:<12}{result['requests']:>9}{result['req_per_s']:>9}"
+            f"{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}"
+            f"{result['queries_per_request']:>13}  {statuses}; {calls or 'none'}"
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the API offline against fake YouTube and Gemini backends.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Repeat to run several; default all")
+    parser.add_argument("--database-url", help="Database to run against; default a temporary SQLite file")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--youtube-latency", type=float, default=0.05, help="Seconds per fake YouTube call")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per fake Gemini call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake calls that fail (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Write results as JSON, for use as a later --baseline")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    # Settings are read at import, so the database must be chosen before the app
+    # loads; environment variables take precedence over .env
+    tmpdir = None
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory(prefix="labelbase-bench-")
+        database_url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database_url
+    os.environ["ASYNC_DATABASE_URI"] = ""  # Derived from the URL above
+
+    try:
+        results = asyncio.run(run_benchmark(args))
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    print_results(results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f), args.max_regression)
+        for failure in failures:
+            print(f"\nFAIL: {failure}")
+        if failures:
+            sys.exit(1)
+        print("\nOK: no regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Cold-start benchmark: how long `import app.main` takes in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.import_time [--runs N] [--budget-ms MS] [--top N]
+
+Each run starts a new interpreter with `python -X importtime -c "import app.main"`
+and sums the cumulative time of the top-level imports. The median over all
+runs is compared to the budget, and the run fails (exit status 1) if it is
+over budget or if a lazily loaded SDK was imported at startup.
+"""
+from typing import Dict, List, Tuple
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = 1500.0
+
+# Must only be imported on first use (see app/services/clients.py)
+LAZY_MODULES = ("google.genai", "googleapiclient", "httplib2")
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Parse -X importtime output.
+
+    Returns:
+        Total milliseconds spent in top-level imports, and the cumulative
+        milliseconds of every imported module
+    """
+    total_us = 0
+    cumulative: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        # "import time:   self_us |   cumulative_us | <indent>module"
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        module = name.strip()
+        cumulative[module] = int(cumulative_us) / 1000
+        # Nested imports are indented by two spaces per level
+        if len(name) - len(name.lstrip()) == 1:
+            total_us += int(cumulative_us)
+    return total_us / 1000, cumulative
+
+def measure(python: str, env: Dict[str, str]) -> Tuple[float, Dict[str, float]]:
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        raise SystemExit(f"import app.main failed with exit status {result.returncode}")
+    return parse_importtime(result.stderr)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure and budget the backend's import time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms", type=float,
+        default=float(os.environ.get("IMPORT_TIME_BUDGET_MS", DEFAULT_BUDGET_MS))
+    )
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # app.db.database builds its engine at import; any URL will do since nothing connects
+    env.setdefault("DATABASE_URL", "sqlite://")
+
+    totals: List[float] = []
+    modules: Dict[str, float] = {}
+    for _ in range(args.runs):
+        total, modules = measure(sys.executable, env)
+        totals.append(total)
+
+    median = statistics.median(totals)
+    print(f"import app.main: median {median:.1f} ms over {args.runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}, budget {args.budget_ms:.0f})")
+    print("\nSlowest modules (cumulative, last run):")
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for module, ms in slowest:
+        print(f"  {ms:9.1f} ms  {module}")
+
+    failures = []
+    eager = [
+        module for module in modules
+        if any(module == lazy or module.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    ]
+    if eager:
+        failures.append(f"lazily loaded SDKs imported at startup: {', '.join(sorted(eager)[:5])}")
+    if median > args.budget_ms:
+        failures.append(f"median import time {median:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("\nOK")
+
+if __name__ == "__main__":
+    main()
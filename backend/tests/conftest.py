@@ -0,0 +1,28 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when app modules are imported, so the test database is
+# chosen before any of them load; environment variables take precedence over .env
+_tmpdir = tempfile.TemporaryDirectory(prefix="labelbase-test-")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmpdir.name, 'test.db')}"
+os.environ["ASYNC_DATABASE_URI"] = ""
+
+from app.db import database  # noqa: E402
+from app.db.base_class import Base  # noqa: E402
+from app.db.models import User  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """A session on empty tables, with the hard-coded user 1."""
+    Base.metadata.create_all(database.engine)
+    session = database.SessionLocal()
+    session.add(User(id=1, email="test@example.com"))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(database.engine)
@@ -0,0 +1,118 @@
+import asyncio
+import datetime
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+
+from app.crud import async_crud_output, async_crud_prompt, crud_output, crud_prompt, crud_video
+from app.db import async_database
+from app.db.models import Output, Prompt
+from app.main import app
+
+
+def _run(fn):
+    """Run fn(session) on an async session, closing the engine with the event loop."""
+    async def main():
+        try:
+            async with async_database.get_async_sessionmaker()() as session:
+                return await fn(session)
+        finally:
+            await async_database.dispose_async_engine()
+    return asyncio.run(main())
+
+
+def _add_prompts(db, count, outputs_each=0):
+    video = crud_video.get_or_create_from_metadata(
+        db, youtube_id="a", video_metadata={"title": "A"}, user_id=1
+    )
+    start = datetime.datetime(2026, 1, 1)
+    prompts = []
+    for i in range(count):
+        prompt = Prompt(
+            id=str(uuid.uuid4()), user_prompt=f"Prompt {i}", user_id=1,
+            created_at=start + datetime.timedelta(minutes=i),
+        )
+        db.add(prompt)
+        for j in range(outputs_each):
+            db.add(Output(
+                id=str(uuid.uuid4()), video_id=video.id, prompt_id=prompt.id, model=f"model-{j}",
+                llm_output={"prompt": i, "run": j}, time_to_generate=1.0,
+                run_date=start + datetime.timedelta(hours=j),
+            ))
+        prompts.append(prompt)
+    db.commit()
+    return [prompt.id for prompt in reversed(prompts)]
+
+
+def test_get_with_outputs_loads_content(db):
+    [prompt_id] = _add_prompts(db, 1, outputs_each=2)
+
+    prompt = _run(lambda session: async_crud_prompt.get_with_outputs(session, prompt_id))
+
+    assert prompt.id == prompt_id
+    assert all(not {"_llm_output", "llm_output_zlib"} & inspect(output).unloaded for output in prompt.outputs)
+    assert sorted(output.llm_output["run"] for output in prompt.outputs) == [0, 1]
+
+
+def test_get_page_matches_sync(db):
+    _add_prompts(db, 5)
+
+    async def pages(session):
+        first, cursor = await async_crud_prompt.get_page(session, limit=3)
+        second, last = await async_crud_prompt.get_page(session, cursor=cursor, limit=3)
+        return [prompt.id for prompt in first], cursor, [prompt.id for prompt in second], last
+
+    first, cursor, second, last = _run(pages)
+    sync_first, sync_cursor = crud_prompt.get_page(db, limit=3)
+    assert first == [prompt.id for prompt in sync_first]
+    assert cursor == sync_cursor
+    assert len(second) == 2
+    assert last is None
+
+
+def test_output_summaries_match_sync(db):
+    prompt_ids = _add_prompts(db, 2, outputs_each=3)
+
+    async def read(session):
+        summaries = await async_crud_output.get_summaries(session, prompt_ids=prompt_ids)
+        latest = await async_crud_output.get_latest_for_prompts(session, prompt_ids=prompt_ids, limit=2)
+        return summaries, {key: [output.id for output in outputs] for key, outputs in latest.items()}
+
+    summaries, latest = _run(read)
+    assert summaries == crud_output.get_summaries(db, prompt_ids=prompt_ids)
+    assert latest == {
+        key: [output.id for output in outputs]
+        for key, outputs in crud_output.get_latest_for_prompts(db, prompt_ids=prompt_ids, limit=2).items()
+    }
+    assert all(len(ids) == 2 for ids in latest.values())
+
+
+def test_get_or_create_by_content_returns_existing(db):
+    [prompt_id] = _add_prompts(db, 1)
+
+    async def create(session):
+        prompt = await async_crud_prompt.get_or_create_by_content(
+            session, id=str(uuid.uuid4()), user_prompt="Prompt 0", user_id=1
+        )
+        await session.commit()
+        return prompt.id
+
+    assert _run(create) == prompt_id
+
+
+def test_prompt_endpoints(db):
+    prompt_ids = _add_prompts(db, 3, outputs_each=2)
+
+    with TestClient(app) as client:
+        page = client.get("/api/prompts/", params={"limit": 2, "include": "outputs", "outputs_limit": 1}).json()
+        rest = client.get("/api/prompts/", params={"cursor": page["next_cursor"]}).json()
+        prompt = client.get(f"/api/prompts/{prompt_ids[0]}").json()
+        missing = client.get("/api/prompts/unknown")
+
+    assert [item["id"] for item in page["items"] + rest["items"]] == prompt_ids
+    assert all(item["output_count"] == 2 and len(item["outputs"]) == 1 for item in page["items"])
+    assert rest["items"][0]["outputs"] is None
+    assert not rest["has_more"]
+    assert sorted(output["llm_output"]["run"] for output in prompt["outputs"]) == [0, 1]
+    assert missing.status_code == 404
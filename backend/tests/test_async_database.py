@@ -0,0 +1,31 @@
+from sqlalchemy.engine import make_url
+
+from app.db import async_database
+
+
+def _derived(monkeypatch, url):
+    monkeypatch.setattr(async_database.settings, "ASYNC_DATABASE_URI", "")
+    monkeypatch.setattr(async_database.settings, "SQLALCHEMY_DATABASE_URI", url)
+    return make_url(async_database.async_database_uri())
+
+
+def test_postgres_url_uses_asyncpg_args(monkeypatch):
+    url = _derived(
+        monkeypatch,
+        "postgresql://user:secret@db:5432/app?sslmode=require&connect_timeout=10&application_name=api"
+    )
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.password == "secret"
+    assert dict(url.query) == {"ssl": "require"}
+
+
+def test_sqlite_url_uses_aiosqlite(monkeypatch):
+    url = _derived(monkeypatch, "sqlite:///./app.db")
+    assert url.drivername == "sqlite+aiosqlite"
+    assert url.database == "./app.db"
+
+
+def test_explicit_async_url_is_used_as_is(monkeypatch):
+    explicit = "postgresql+asyncpg://user@db/app?ssl=verify-full&application_name=api"
+    monkeypatch.setattr(async_database.settings, "ASYNC_DATABASE_URI", explicit)
+    assert async_database.async_database_uri() == explicit
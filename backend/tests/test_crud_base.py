@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from app.crud import crud_video
+from app.db import database
+from app.db.models import Video
+
+
+def _video_row(youtube_id, title):
+    return {"youtube_id": youtube_id, "title": title, "user_id": 1}
+
+
+def test_upsert_many_updates_on_conflict(db):
+    crud_video.upsert_many(db, objs_in=[_video_row("a", "Old")], index_elements=["youtube_id"])
+    videos = crud_video.upsert_many(
+        db, objs_in=[_video_row("a", "New"), _video_row("b", "B")],
+        index_elements=["youtube_id"], refresh=True,
+    )
+
+    assert sorted((video.youtube_id, video.title) for video in videos) == [("a", "New"), ("b", "B")]
+    assert db.query(Video).count() == 2
+
+
+def test_upsert_many_do_nothing_keeps_existing_rows(db):
+    crud_video.upsert_many(db, objs_in=[_video_row("a", "Old")], index_elements=["youtube_id"])
+    videos = crud_video.upsert_many(
+        db, objs_in=[_video_row("a", "New"), _video_row("b", "B")],
+        index_elements=["youtube_id"], update_fields=[], refresh=True,
+    )
+
+    # Skipped rows are not returned
+    assert [video.youtube_id for video in videos] == ["b"]
+    assert crud_video.get_by_youtube_id(db, youtube_id="a").title == "Old"
+
+
+def test_upsert_many_dedupes_keys_within_a_call(db):
+    crud_video.upsert_many(
+        db, objs_in=[_video_row("a", "First"), _video_row("a", "Last")], index_elements=["youtube_id"],
+    )
+
+    assert db.query(Video).count() == 1
+    assert crud_video.get_by_youtube_id(db, youtube_id="a").title == "Last"
+
+
+def test_upsert_many_chunks_into_one_transaction(db):
+    rows = [_video_row(f"v{i}", f"Video {i}") for i in range(5)]
+    crud_video.upsert_many(db, objs_in=rows, index_elements=["youtube_id"], chunk_size=2)
+    assert db.query(Video).count() == 5
+
+
+@contextmanager
+def _count_statements(prefix):
+    statements = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(prefix):
+            statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before)
+    try:
+        yield statements
+    finally:
+        event.remove(database.engine, "before_cursor_execute", before)
+
+
+def test_create_many_inserts_in_chunks(db):
+    rows = [_video_row(f"v{i}", f"Video {i}") for i in range(5)]
+    with _count_statements("INSERT") as inserts:
+        result = crud_video.create_many(db, objs_in=rows, chunk_size=2)
+
+    assert result is None
+    assert len(inserts) == 3
+    assert sorted(video.youtube_id for video in db.query(Video)) == [f"v{i}" for i in range(5)]
+
+
+def test_create_many_refresh_returns_objects(db):
+    rows = [dict(_video_row(f"v{i}", f"Video {i}"), not_a_column="ignored") for i in range(3)]
+    videos = crud_video.create_many(db, objs_in=rows, chunk_size=2, refresh=True)
+
+    assert sorted((video.youtube_id, video.title) for video in videos) == [
+        ("v0", "Video 0"), ("v1", "Video 1"), ("v2", "Video 2")
+    ]
+    assert all(video.id is not None and video.created_at is not None for video in videos)
+
+
+def test_create_many_rolls_back_every_chunk_on_error(db):
+    rows = [_video_row("a", "A"), _video_row("b", "B"), _video_row("a", "Duplicate")]
+    with pytest.raises(IntegrityError):
+        crud_video.create_many(db, objs_in=rows, chunk_size=2)
+
+    assert db.query(Video).count() == 0
+
+
+def test_update_many_updates_by_primary_key_in_chunks(db):
+    videos = crud_video.create_many(
+        db, objs_in=[_video_row(f"v{i}", f"Video {i}") for i in range(5)], refresh=True
+    )
+    ids = sorted(video.id for video in videos)
+
+    with _count_statements("UPDATE") as updates:
+        crud_video.update_many(
+            db, values=[{"id": id, "title": f"Renamed {id}"} for id in ids[:4]], chunk_size=3
+        )
+
+    assert len(updates) == 2
+    db.expire_all()
+    titles = {video.id: video.title for video in db.query(Video)}
+    assert [titles[id] for id in ids] == [f"Renamed {id}" for id in ids[:4]] + ["Video 4"]
+
+
+def test_remove(db):
+    video = crud_video.create_many(db, objs_in=[_video_row("a", "A")], refresh=True)[0]
+
+    removed = crud_video.remove(db, id=video.id)
+
+    assert removed.youtube_id == "a"
+    assert crud_video.get(db, id=video.id) is None
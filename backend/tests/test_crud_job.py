@@ -0,0 +1,96 @@
+import datetime
+import uuid
+
+from app.crud import crud_job
+from app.db.models import JobItem, Prompt
+from app.db.models.job import JobItemStatus
+
+
+def _job(db, *, prompts=1, videos=1):
+    prompt_ids = []
+    for i in range(prompts):
+        prompt = Prompt(id=str(uuid.uuid4()), user_prompt=f"Prompt {i}", user_id=1)
+        db.add(prompt)
+        prompt_ids.append(prompt.id)
+    db.commit()
+    video_urls = [f"https://www.youtube.com/watch?v=video{i}" for i in range(videos)]
+    return crud_job.create_with_items(db, prompt_ids=prompt_ids, video_urls=video_urls, user_id=1)
+
+
+def _claim(db, *, limit=10, lease_seconds=60, max_attempts=3):
+    return crud_job.claim_items(db, limit=limit, lease_seconds=lease_seconds, max_attempts=max_attempts)
+
+
+def test_claim_items_claims_pending_items_once(db):
+    job = _job(db, prompts=2, videos=2)
+
+    first = _claim(db, limit=3)
+    second = _claim(db)
+
+    assert len(first) == 3
+    assert len(second) == 1
+    assert {item.id for item in first} | {item.id for item in second} == {item.id for item in job.items}
+    assert all(item.attempts == 1 for item in first + second)
+    assert first[0].prompt_text.startswith("Prompt ")
+    assert _claim(db) == []
+
+
+def test_retried_item_is_claimable_after_its_delay(db):
+    _job(db)
+    [item] = _claim(db)
+
+    crud_job.retry_item(db, item_id=item.id, delay=3600, error="rate limited")
+    assert _claim(db) == []
+
+    crud_job.retry_item(db, item_id=item.id, delay=0)
+    [again] = _claim(db)
+    assert again.id == item.id
+    assert again.attempts == 2
+
+
+def test_retry_without_counting_the_attempt(db):
+    _job(db)
+    [item] = _claim(db)
+
+    crud_job.retry_item(db, item_id=item.id, delay=0, count_attempt=False)
+    [again] = _claim(db)
+    assert again.attempts == 1
+
+
+def test_expired_lease_is_reclaimed(db):
+    _job(db)
+    [item] = _claim(db)
+    db.query(JobItem).filter(JobItem.id == item.id).update(
+        {"claimed_at": datetime.datetime.utcnow() - datetime.timedelta(seconds=120)}
+    )
+    db.commit()
+
+    [again] = _claim(db, lease_seconds=60)
+    assert again.id == item.id
+    assert again.attempts == 2
+
+
+def test_expired_lease_on_last_attempt_fails_the_item(db):
+    _job(db)
+    [item] = _claim(db, max_attempts=1)
+    db.query(JobItem).filter(JobItem.id == item.id).update(
+        {"claimed_at": datetime.datetime.utcnow() - datetime.timedelta(seconds=120)}
+    )
+    db.commit()
+
+    assert _claim(db, lease_seconds=60, max_attempts=1) == []
+    stored = db.get(JobItem, item.id)
+    db.refresh(stored)
+    assert stored.status == JobItemStatus.FAILED
+    assert stored.error == "Worker lease expired"
+
+
+def test_failed_and_done_items_are_not_claimed(db):
+    job = _job(db, prompts=2)
+    first, second = _claim(db)
+
+    crud_job.fail_item(db, item_id=first.id, error="bad video")
+    crud_job.complete_item(db, item_id=second.id, output_id=None)
+
+    assert _claim(db) == []
+    assert crud_job.get_counts(db, job_id=job.id) == {JobItemStatus.FAILED: 1, JobItemStatus.DONE: 1}
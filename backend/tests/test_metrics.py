@@ -0,0 +1,31 @@
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.main import app
+
+
+def _routes(method):
+    return {
+        labels["route"] for name, labels, _ in metrics.http_request_duration.samples()
+        if name.endswith("_count") and labels["method"] == method
+    }
+
+
+def test_route_labels_include_router_prefixes(db):
+    with TestClient(app) as client:
+        assert client.get("/api/prompts/").status_code == 200
+        assert client.get("/api/videos/").status_code == 200
+        assert client.get("/api/videos/12345").status_code == 404
+
+    routes = _routes("GET")
+    assert {"/api/prompts/", "/api/videos/", "/api/videos/{video_id}"} <= routes
+    assert "/" not in routes
+    assert "/{video_id}" not in routes
+
+
+def test_unmatched_requests_share_one_label(db):
+    with TestClient(app) as client:
+        client.delete("/api/no-such-route/1")
+        client.delete("/api/no-such-route/2")
+
+    assert _routes("DELETE") == {"unmatched"}
@@ -0,0 +1,105 @@
+import uuid
+
+import pytest
+from sqlalchemy import inspect, text
+
+from app.crud import crud_output, crud_prompt, crud_video
+from app.db.models import Output, Prompt
+
+SMALL = {"labels": ["cat", "dog"], "score": 0.5, "empty": None}
+LARGE = {"labels": ["cat", "dog"], "nested": {"text": "é" * 10000}, "empty": None}
+
+DOCUMENT_COLUMNS = {"_llm_output", "llm_output_zlib"}
+
+
+def _output(db, llm_output):
+    video = crud_video.get_or_create_from_metadata(
+        db, youtube_id="a", video_metadata={"title": "A"}, user_id=1
+    )
+    prompt = Prompt(id=str(uuid.uuid4()), user_prompt="Describe the video", user_id=1)
+    db.add(prompt)
+    output = Output(
+        id=str(uuid.uuid4()), video_id=video.id, prompt_id=prompt.id, model="gemini-2.0-flash",
+        llm_output=llm_output, time_to_generate=1.5,
+    )
+    db.add(output)
+    db.commit()
+    return output.id, prompt.id
+
+
+@pytest.mark.parametrize("document", [SMALL, LARGE])
+def test_llm_output_round_trips(db, document):
+    output_id, _ = _output(db, document)
+    db.expire_all()
+
+    output = db.get(Output, output_id)
+    assert DOCUMENT_COLUMNS <= inspect(output).unloaded  # Deferred until accessed
+    assert output.llm_output == document
+
+
+def test_small_document_is_stored_as_json(db):
+    output_id, _ = _output(db, SMALL)
+
+    stored, compressed = db.execute(
+        text("SELECT llm_output, llm_output_zlib FROM outputs WHERE id = :id"), {"id": output_id}
+    ).one()
+    assert compressed is None
+    assert stored.startswith("{")
+
+
+def test_large_document_is_stored_compressed(db):
+    output_id, _ = _output(db, LARGE)
+
+    stored, compressed = db.execute(
+        text("SELECT llm_output, llm_output_zlib FROM outputs WHERE id = :id"), {"id": output_id}
+    ).one()
+    assert stored is None
+    assert len(compressed) < 1000
+
+
+def test_replacing_a_document_clears_the_other_column(db):
+    output_id, _ = _output(db, LARGE)
+    output = db.get(Output, output_id)
+    output.llm_output = SMALL
+    db.commit()
+    db.expire_all()
+
+    output = db.get(Output, output_id)
+    assert output.llm_output_zlib is None
+    assert output.llm_output == SMALL
+
+
+def test_prompt_loads_outputs_with_content(db):
+    _, prompt_id = _output(db, LARGE)
+    db.expire_all()
+
+    prompt = crud_prompt.get_with_outputs(db, prompt_id)
+    [output] = prompt.outputs
+    assert not DOCUMENT_COLUMNS & inspect(output).unloaded
+    assert output.llm_output == LARGE
+
+
+def test_cache_probe_loads_content_only_when_asked(db):
+    _output(db, LARGE)
+    db.expire_all()
+
+    with_content = crud_output.get_cached(
+        db, youtube_id="a", model="gemini-2.0-flash", prompt_text="Describe the video"
+    )
+    assert not DOCUMENT_COLUMNS & inspect(with_content).unloaded
+    assert with_content.llm_output == LARGE
+
+    db.expire_all()
+    keys_only = crud_output.get_cached(
+        db, youtube_id="a", model="gemini-2.0-flash", prompt_text="Describe the video", with_content=False
+    )
+    assert DOCUMENT_COLUMNS <= inspect(keys_only).unloaded
+
+
+def test_latest_outputs_load_content(db):
+    _, prompt_id = _output(db, LARGE)
+    db.expire_all()
+
+    [output] = crud_output.get_latest_for_prompts(db, prompt_ids=[prompt_id], limit=5)[prompt_id]
+    assert not DOCUMENT_COLUMNS & inspect(output).unloaded
+    assert output.llm_output == LARGE
@@ -0,0 +1,75 @@
+import datetime
+import uuid
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.crud import crud_prompt
+from app.db.models import Prompt
+
+
+def test_cursor_round_trip():
+    created_at = datetime.datetime(2026, 10, 18, 12, 30, 45, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    assert decode_cursor(encode_cursor(created_at, "abc")) == (created_at, "abc")
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(datetime.datetime(2026, 1, 1), "id/with+chars?")
+    assert "=" not in cursor
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor(datetime.datetime(2026, 1, 1), 1)[:-3]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def _add_prompts(db, count):
+    start = datetime.datetime(2026, 1, 1)
+    prompts = []
+    for i in range(count):
+        # Pairs share a timestamp, so the id breaks ties
+        prompt = Prompt(
+            id=str(uuid.uuid4()), user_prompt=f"Prompt {i}", user_id=1,
+            created_at=start + datetime.timedelta(minutes=i // 2),
+        )
+        db.add(prompt)
+        prompts.append(prompt)
+    db.commit()
+    return sorted(prompts, key=lambda prompt: (prompt.created_at, prompt.id), reverse=True)
+
+
+def test_get_page_walks_every_row_once(db):
+    expected = [prompt.id for prompt in _add_prompts(db, 7)]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = crud_prompt.get_page(db, cursor=cursor, limit=3)
+        seen.extend(row.id for row in rows)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert pages == 3
+
+
+def test_get_page_exact_fit_has_no_next_page(db):
+    _add_prompts(db, 3)
+    rows, cursor = crud_prompt.get_page(db, limit=3)
+    assert len(rows) == 3
+    assert cursor is None
+
+
+def test_get_page_ignores_rows_inserted_before_the_cursor(db):
+    prompts = _add_prompts(db, 4)
+    _, cursor = crud_prompt.get_page(db, limit=2)
+
+    db.add(Prompt(id=str(uuid.uuid4()), user_prompt="Newer", user_id=1, created_at=datetime.datetime(2027, 1, 1)))
+    db.commit()
+
+    rows, cursor = crud_prompt.get_page(db, cursor=cursor, limit=2)
+    assert [row.id for row in rows] == [prompt.id for prompt in prompts[2:]]
+    assert cursor is None
@@ -0,0 +1,46 @@
+import asyncio
+import uuid
+
+from app.core.config import settings
+from app.core.hashing import run_key
+from app.crud import crud_video
+from app.db.models import Output, Prompt
+from app.db.models.run_claim import RunClaim
+from app.services import llm_service, prompt_runner
+
+
+def _collect(events):
+    async def main():
+        return [event async for event in events]
+    return asyncio.run(main())
+
+
+def test_stream_serves_output_saved_before_the_claim(db, monkeypatch):
+    # The output was stored by another worker after prepare_run found none
+    video = crud_video.get_or_create_from_metadata(
+        db, youtube_id="a", video_metadata={"title": "A"}, user_id=1
+    )
+    prompt = Prompt(id=str(uuid.uuid4()), user_prompt="Describe the video", user_id=1)
+    db.add(prompt)
+    db.add(Output(
+        id=str(uuid.uuid4()), video_id=video.id, prompt_id=prompt.id, model=settings.GEMINI_MODEL,
+        llm_output={"content": "stored"}, time_to_generate=1.0,
+    ))
+    db.commit()
+
+    def stream_prompt_async(**kwargs):
+        raise AssertionError("the stored output should be served without calling Gemini")
+    monkeypatch.setattr(llm_service, "stream_prompt_async", stream_prompt_async)
+
+    prepared = prompt_runner.PreparedRun(video.id, "a", prompt.id, None)
+    events = _collect(prompt_runner.stream_prompt(
+        prepared, video_url="https://www.youtube.com/watch?v=a",
+        prompt_text="Describe the video", prompt_id=prompt.id
+    ))
+
+    assert events == [
+        ("chunk", {"text": "stored"}),
+        ("done", {"promptId": prompt.id, "output": {"content": "stored"}}),
+    ]
+    assert db.query(Output).count() == 1
+    assert db.get(RunClaim, run_key("a", "Describe the video", settings.GEMINI_MODEL)) is None
@@ -0,0 +1,114 @@
+import asyncio
+import datetime
+
+from app.db.models.run_claim import RunClaim
+from app.services import single_flight
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_task():
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("key", fn) for _ in range(10)))
+        return flight, results
+
+    flight, results = asyncio.run(main())
+    assert calls == 1
+    assert results == [1] * 10
+    assert "key" not in flight
+
+
+def test_different_keys_run_separately():
+    async def main():
+        flight = SingleFlight()
+
+        async def value(v):
+            await asyncio.sleep(0.01)
+            return v
+
+        return await asyncio.gather(flight.do("a", lambda: value("a")), flight.do("b", lambda: value("b")))
+
+    assert asyncio.run(main()) == ["a", "b"]
+
+
+def test_finished_key_runs_again():
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def main():
+        flight = SingleFlight()
+        return [await flight.do("key", fn), await flight.do("key", fn)]
+
+    assert asyncio.run(main()) == [1, 2]
+
+
+def test_error_reaches_every_caller_and_is_not_kept():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+        return flight, results
+
+    flight, results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_task():
+    async def main():
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def fn():
+            started.set()
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", fn))
+        await started.wait()
+        second = asyncio.ensure_future(flight.do("key", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_claim_is_exclusive_until_released(db):
+    assert single_flight.try_claim(db, "run")
+    assert single_flight.claim_is_live(db, "run")
+    assert not single_flight.try_claim(db, "run")
+
+    single_flight.release_claim(db, "run")
+    assert not single_flight.claim_is_live(db, "run")
+    assert single_flight.try_claim(db, "run")
+
+
+def test_stale_claim_is_replaced(db, monkeypatch):
+    monkeypatch.setattr(single_flight.settings, "RUN_CLAIM_TTL", 60)
+    db.add(RunClaim(key="run", claimed_at=datetime.datetime.utcnow() - datetime.timedelta(seconds=120)))
+    db.commit()
+
+    assert not single_flight.claim_is_live(db, "run")
+    assert single_flight.try_claim(db, "run")
+    assert single_flight.claim_is_live(db, "run")
+
+
+def test_claims_are_per_key(db):
+    assert single_flight.try_claim(db, "a")
+    assert single_flight.try_claim(db, "b")
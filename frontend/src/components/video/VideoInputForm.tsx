@@ -5,7 +5,7 @@ import { useForm } from "react-hook-form";
 import { zodResolver } from "@hookform/resolvers/zod";
 import { z } from "zod";
 import {
-  runPrompt,
+  runPromptStream,
   type runPromptResponse,
   getPrompts,
   getVideos,
@@ -21,16 +21,23 @@ type VideoInputFormData = z.infer<typeof videoInputSchema>;
 
 type InputMode = "new" | "existing";
 
+// Select option that fetches the next page of a listing
+const LOAD_MORE = "__load_more__";
+
 export default function VideoInputForm() {
   const [isLoading, setIsLoading] = useState(false);
   const [isLoadingData, setIsLoadingData] = useState(true);
   const [response, setResponse] = useState<runPromptResponse | null>(null);
+  const [streamedContent, setStreamedContent] = useState("");
   const [error, setError] = useState<string | null>(null);
   const [videoMode, setVideoMode] = useState<InputMode>("new");
   const [promptMode, setPromptMode] = useState<InputMode>("new");
   const [existingVideos, setExistingVideos] = useState<Video[]>([]);
   const [existingPrompts, setExistingPrompts] = useState<Prompt[]>([]);
   const [selectedPromptId, setSelectedPromptId] = useState<string | null>(null);
+  const [videosCursor, setVideosCursor] = useState<string | null>(null);
+  const [promptsCursor, setPromptsCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   const {
     register,
@@ -63,6 +70,8 @@ export default function VideoInputForm() {
 
         setExistingVideos(videosResponse?.videos || []);
         setExistingPrompts(promptsResponse?.prompts || []);
+        setVideosCursor(videosResponse?.hasMore ? videosResponse.nextCursor : null);
+        setPromptsCursor(promptsResponse?.hasMore ? promptsResponse.nextCursor : null);
         
         console.log('Set videos:', videosResponse?.videos || []);
         console.log('Set prompts:', promptsResponse?.prompts || []);
@@ -76,15 +85,48 @@ export default function VideoInputForm() {
     fetchExistingData();
   }, []);
 
+  const loadMoreVideos = async () => {
+    if (!videosCursor || isLoadingMore) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await getVideos(videosCursor);
+      setExistingVideos((current) => [...current, ...page.videos]);
+      setVideosCursor(page.hasMore ? page.nextCursor : null);
+    } catch (error) {
+      setError(error instanceof Error ? error.message : "Failed to load more videos");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
+  const loadMorePrompts = async () => {
+    if (!promptsCursor || isLoadingMore) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await getPrompts(promptsCursor);
+      setExistingPrompts((current) => [...current, ...page.prompts]);
+      setPromptsCursor(page.hasMore ? page.nextCursor : null);
+    } catch (error) {
+      setError(error instanceof Error ? error.message : "Failed to load more prompts");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const onSubmit = async (data: VideoInputFormData) => {
     setIsLoading(true);
     setError(null);
+    setResponse(null);
+    setStreamedContent("");
     try {
-      const response = await runPrompt({
-        videoUrl: data.videoUrl,
-        prompt: data.prompt,
-        promptId: selectedPromptId || undefined,
-      });
+      const response = await runPromptStream(
+        {
+          videoUrl: data.videoUrl,
+          prompt: data.prompt,
+          promptId: selectedPromptId || undefined,
+        },
+        (text) => setStreamedContent((current) => current + text),
+      );
       setResponse(response);
     } catch (error) {
       setError(error instanceof Error ? error.message : "An error occurred");
@@ -94,6 +136,10 @@ export default function VideoInputForm() {
   };
 
   const handleVideoSelect = (videoId: string) => {
+    if (videoId === LOAD_MORE) {
+      loadMoreVideos();
+      return;
+    }
     console.log('Selected video ID:', videoId);
     console.log('Available videos:', existingVideos);
     const selectedVideo = existingVideos.find((v) => v.id.toString() === videoId);
@@ -107,6 +153,10 @@ export default function VideoInputForm() {
   };
 
   const handlePromptSelect = (promptId: string) => {
+    if (promptId === LOAD_MORE) {
+      loadMorePrompts();
+      return;
+    }
     console.log('Selected prompt ID:', promptId);
     console.log('Available prompts:', existingPrompts);
     const selectedPrompt = existingPrompts.find((p) => p.id === promptId);
@@ -185,7 +235,11 @@ export default function VideoInputForm() {
                 <select
                   id="existingVideo"
                   className="input-primary"
-                  onChange={(e) => handleVideoSelect(e.target.value)}
+                  onChange={(e) => {
+                    const value = e.target.value;
+                    if (value === LOAD_MORE) e.target.value = "";
+                    handleVideoSelect(value);
+                  }}
                 >
                   <option value="">Select a video...</option>
                   {existingVideos && existingVideos.length > 0 ? (
@@ -197,6 +251,11 @@ export default function VideoInputForm() {
                   ) : (
                     <option value="" disabled>No existing videos found</option>
                   )}
+                  {videosCursor && (
+                    <option value={LOAD_MORE}>
+                      {isLoadingMore ? "Loading..." : "Load more videos..."}
+                    </option>
+                  )}
                 </select>
               </div>
             </div>
@@ -259,7 +318,11 @@ export default function VideoInputForm() {
                 <select
                   id="existingPrompt"
                   className="input-primary"
-                  onChange={(e) => handlePromptSelect(e.target.value)}
+                  onChange={(e) => {
+                    const value = e.target.value;
+                    if (value === LOAD_MORE) e.target.value = "";
+                    handlePromptSelect(value);
+                  }}
                 >
                   <option value="">Select a prompt...</option>
                   {existingPrompts && existingPrompts.length > 0 ? (
@@ -271,6 +334,11 @@ export default function VideoInputForm() {
                   ) : (
                     <option value="" disabled>No existing prompts found</option>
                   )}
+                  {promptsCursor && (
+                    <option value={LOAD_MORE}>
+                      {isLoadingMore ? "Loading..." : "Load more prompts..."}
+                    </option>
+                  )}
                 </select>
               </div>
             </div>
@@ -299,6 +367,15 @@ export default function VideoInputForm() {
         </div>
       )}
 
+      {isLoading && streamedContent && (
+        <div className="rounded-md bg-green-50 p-4">
+          <h4 className="text-sm font-medium text-green-800 mb-2">Generating...</h4>
+          <div className="bg-white p-4 rounded-md border border-green-200">
+            <pre className="whitespace-pre-wrap text-sm">{streamedContent}</pre>
+          </div>
+        </div>
+      )}
+
       {response && (
         <div className="rounded-md bg-green-50 p-4">
           <div className="flex flex-col space-y-4">
@@ -10,12 +10,23 @@ const api = axios.create({
   },
 });
 
+// One page of a cursor-paginated listing
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+  has_more: boolean;
+}
+
 export interface getPromptsResponse {
   prompts: Prompt[];
+  nextCursor: string | null;
+  hasMore: boolean;
 }
 
 export interface getVideosResponse {
   videos: Video[];
+  nextCursor: string | null;
+  hasMore: boolean;
 }
 
 export interface runPromptRequest {
@@ -41,10 +52,81 @@ export const runPrompt = async (data: runPromptRequest): Promise<runPromptRespon
   }
 };
 
-export const getPrompts = async (): Promise<getPromptsResponse> => {
+const parseSSEEvent = (raw: string): { event: string; data: string } => {
+  let event = 'message';
+  const data: string[] = [];
+  for (const line of raw.split('\n')) {
+    if (line.startsWith('event:')) {
+      event = line.slice(6).trim();
+    } else if (line.startsWith('data:')) {
+      data.push(line.slice(5).trim());
+    }
+  }
+  return { event, data: data.join('\n') };
+};
+
+export const runPromptStream = async (
+  data: runPromptRequest,
+  onChunk: (text: string) => void,
+): Promise<runPromptResponse> => {
+  const response = await fetch(`${API_BASE_URL}/api/prompts/run_prompt/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+    },
+    body: JSON.stringify(data),
+  });
+  if (!response.ok || !response.body) {
+    const body = await response.json().catch(() => null);
+    throw new Error(body?.detail || 'Failed to run prompt');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const { event, data: payload } = parseSSEEvent(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      if (event === 'chunk') {
+        onChunk(JSON.parse(payload).text);
+      } else if (event === 'done') {
+        return JSON.parse(payload) as runPromptResponse;
+      } else if (event === 'error') {
+        throw new Error(JSON.parse(payload).detail || 'Failed to run prompt');
+      }
+    }
+  }
+  throw new Error('Stream ended before the prompt finished');
+};
+
+// Pass the previous response's nextCursor to fetch the following page
+export const getPrompts = async (
+  cursor?: string | null,
+  limit = 100,
+  includeOutputs = false,
+): Promise<getPromptsResponse> => {
   try {
-    const response = await api.get<Prompt[]>('/api/prompts');
-    return { prompts: response.data };
+    const response = await api.get<Page<Prompt>>('/api/prompts', {
+      params: {
+        cursor: cursor || undefined,
+        limit,
+        include: includeOutputs ? 'outputs' : undefined,
+      },
+    });
+    return {
+      prompts: response.data.items,
+      nextCursor: response.data.next_cursor,
+      hasMore: response.data.has_more,
+    };
   } catch (error) {
     console.error('Error fetching prompts:', error);
     if (axios.isAxiosError(error)) {
@@ -54,14 +136,20 @@ export const getPrompts = async (): Promise<getPromptsResponse> => {
   }
 };
 
-export const getVideos = async (): Promise<getVideosResponse> => {
+export const getVideos = async (cursor?: string | null, limit = 100): Promise<getVideosResponse> => {
   try {
-    const response = await api.get<Video[]>('/api/videos');
-    return { videos: response.data };
+    const response = await api.get<Page<Video>>('/api/videos', {
+      params: { cursor: cursor || undefined, limit },
+    });
+    return {
+      videos: response.data.items,
+      nextCursor: response.data.next_cursor,
+      hasMore: response.data.has_more,
+    };
   } catch (error) {
     if (axios.isAxiosError(error)) {
       throw new Error(error.response?.data?.detail || 'Failed to fetch videos');
     }
     throw error;
   }
-};
\ No newline at end of file
+};
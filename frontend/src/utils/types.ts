@@ -4,10 +4,11 @@ export type Video = {
   id: number;
   youtube_id: string;
   title: string;
-  description: string;
-  video_metadata: any;
+  // Large columns; only present when requested with ?fields=
+  description?: string;
+  video_metadata?: any;
   created_at: string;
-  updated_at: string | null;
+  updated_at?: string | null;
   user_id: number;
 }
 
@@ -15,9 +16,17 @@ export interface Output {
   id: string;
   video_id: number;
   prompt_id: string;
-  llm_output: string;
+  llm_output: LLMResponse;
   run_date: string;
   time_to_generate: number;
+  model: string;
+  model_version?: string | null;
+  prompt_tokens?: number | null;
+  video_tokens?: number | null;
+  audio_tokens?: number | null;
+  output_tokens?: number | null;
+  cached_tokens?: number | null;
+  total_tokens?: number | null;
 }
 
 export interface Prompt {
@@ -27,15 +36,21 @@ export interface Prompt {
   user_prompt: string;
   created_at: string;
   updated_at?: string;
-  outputs: Output[];
+  output_count?: number;
+  last_run_date?: string | null;
+  // Only the latest few, and only when listed with include=outputs
+  outputs?: Output[] | null;
 }
 
 export type LLMResponse = {
   content: string;
   model: string;
   usage: {
-    prompt_tokens: number;
-    completion_tokens: number;
-    total_tokens: number;
+    prompt_tokens: number | null;
+    video_tokens: number | null;
+    audio_tokens: number | null;
+    completion_tokens: number | null;
+    cached_tokens: number | null;
+    total_tokens: number | null;
   }
 }